@@ -1,36 +1,367 @@
-import google.generativeai as genai
+import re
 import time
+import hashlib
+import threading
+from contextlib import nullcontext
 
-def analyze_with_gemini(st, prompt, stream=True):
+import prompts
+import gemini_utils
+import storage_utils
+from youtube_utils import run_concurrently
+
+GEMINI_SYSTEM_INSTRUCTION = "You are an expert YouTube content creator and analyst. You analyze scripts, comments, and channel data to provide actionable insights. Please respond in Korean."
+GEMINI_CACHE_NAMESPACE = 'gemini_responses'
+GEMINI_CACHE_MAX_BYTES = 50 * 1024 * 1024
+GEMINI_CACHE_MAX_ENTRIES = 5000
+
+STREAM_FLUSH_INTERVAL = 0.25  # 스트리밍 중 화면 갱신 최소 간격(초)
+STREAM_FLUSH_CHARS = 400  # 이만큼 새 글자가 쌓이면 간격과 상관없이 갱신
+STREAM_STATS_HISTORY = 50
+
+CHARS_PER_TOKEN = 2  # 한국어/영어가 섞인 대본의 보수적인 글자 수/토큰 비율
+CHANNEL_SINGLE_PASS_TOKENS = 40000  # 이보다 짧은 스크립트 모음은 한 번에 분석합니다.
+CHANNEL_CHUNK_TOKENS = 20000  # 부분 요약 한 번에 넣을 스크립트 분량
+CHANNEL_MAP_WORKERS = 4
+
+# 개별 영상 분석 프롬프트의 항목별 토큰 예산 (제목은 자르지 않습니다)
+INDIVIDUAL_FIELD_BUDGETS = {
+    "script": 12000,
+    "description": 1000,
+    "comments": 3000,
+}
+TRANSCRIPT_HEAD_RATIO = 0.7  # 대본이 예산을 넘으면 앞부분 70%, 뒷부분 30%를 남깁니다.
+TOKEN_COUNT_CACHE_NAMESPACE = 'gemini_token_counts'
+TOKEN_COUNT_CACHE_MAX_ENTRIES = 20000
+
+def response_cache_key(model_name, system_instruction, prompt):
+    """SHA-256 over everything that determines the response."""
+    payload = "\0".join((model_name, system_instruction, prompt))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _load_cached_response(cache_key):
+    try:
+        return storage_utils.cache_get(GEMINI_CACHE_NAMESPACE, cache_key)
+    except Exception:
+        return None # 캐시 장애가 분석을 막지 않도록 무시합니다.
+
+def _save_cached_response(cache_key, text):
+    try:
+        storage_utils.cache_set(GEMINI_CACHE_NAMESPACE, cache_key, text, max_bytes=GEMINI_CACHE_MAX_BYTES, max_entries=GEMINI_CACHE_MAX_ENTRIES)
+    except Exception:
+        pass
+
+_stream_stats_lock = threading.Lock()
+_stream_stats = []
+
+
+class StreamRenderer:
+    """
+    Collects streamed text in a list buffer and re-renders the placeholder only every
+    STREAM_FLUSH_INTERVAL seconds or STREAM_FLUSH_CHARS new characters, instead of on every chunk.
+    Also measures time to first token and total stream time from 'started_at'.
+    """
+    def __init__(self, placeholder, started_at):
+        self.placeholder = placeholder
+        self.started_at = started_at
+        self.first_token_at = None
+        self.finished_at = None
+        self.chunks = 0
+        self.flushes = 0
+        self._parts = []
+        self._pending_chars = 0
+        self._last_flush = started_at
+
+    def write(self, text):
+        if not text:
+            return
+        now = time.monotonic()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self._parts.append(text)
+        self.chunks += 1
+        self._pending_chars += len(text)
+        if self._pending_chars >= STREAM_FLUSH_CHARS or now - self._last_flush >= STREAM_FLUSH_INTERVAL:
+            self._flush(now)
+
+    def _flush(self, now):
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        self.placeholder.markdown(self._parts[0] if self._parts else "")
+        self.flushes += 1
+        self._pending_chars = 0
+        self._last_flush = now
+
+    def close(self):
+        """Renders whatever is still pending and returns the full text."""
+        now = time.monotonic()
+        if self._pending_chars:
+            self._flush(now)
+        self.finished_at = now
+        return self.text
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def stats(self):
+        end = self.finished_at or time.monotonic()
+        return {
+            "ttft": self.first_token_at - self.started_at if self.first_token_at is not None else None,
+            "total": end - self.started_at,
+            "chunks": self.chunks,
+            "flushes": self.flushes,
+            "chars": len(self.text),
+        }
+
+def _record_stream_stats(stats):
+    with _stream_stats_lock:
+        _stream_stats.append(stats)
+        del _stream_stats[:-STREAM_STATS_HISTORY]
+
+def stream_stats():
+    """Recent streaming timings (oldest first), see StreamRenderer.stats()."""
+    with _stream_stats_lock:
+        return list(_stream_stats)
+
+def analyze_with_gemini(st, prompt, stream=True, container=None, model_name=None):
     """
     Calls the Gemini API with the given prompt and streams the response.
     'st' is the streamlit object to display real-time responses.
+    'container' (e.g. a st.container() panel) receives the output and errors instead of the main area.
+    'model_name' overrides the model selected on the settings page (st.session_state.gemini_model).
+    Identical requests are answered from the response cache unless st.session_state.gemini_bypass_cache
+    is set; a bypassed request still refreshes the cached response.
     """
-    if not st.session_state.get("gemini_api_key"):
-        st.error("Gemini API 키가 설정되지 않았습니다. '설정' 페이지에서 키를 입력해주세요.")
+    output = container or st
+    if not gemini_utils.get_api_keys(st):
+        output.error("Gemini API 키가 설정되지 않았습니다. '설정' 페이지에서 키를 입력해주세요.")
         return None
 
-    try:
-        genai.configure(api_key=st.session_state.gemini_api_key)
-        model = genai.GenerativeModel(
-            model_name="gemini-2.5-pro-preview-06-05", # Corrected model name
-            system_instruction="You are an expert YouTube content creator and analyst. You analyze scripts, comments, and channel data to provide actionable insights. Please respond in Korean."
-        )
+    model_name = gemini_utils.get_model_name(st, model_name)
+    cache_key = response_cache_key(model_name, GEMINI_SYSTEM_INSTRUCTION, prompt)
+    if not st.session_state.get("gemini_bypass_cache"):
+        cached = _load_cached_response(cache_key)
+        if cached is not None:
+            if stream:
+                output.empty().markdown(cached)
+                output.caption("💾 이전과 같은 요청이라 저장된 분석 결과를 표시합니다.")
+            return cached
 
-        response = model.generate_content(prompt, stream=stream)
+    stats = None
+    try:
+        started_at = time.monotonic()
+        response = gemini_utils.generate_content(st, prompt, GEMINI_SYSTEM_INSTRUCTION, model_name=model_name, stream=stream, output=output)
+        if response is None:
+            return None
         
         if stream:
-            full_response = ""
-            response_container = st.empty()
+            renderer = StreamRenderer(output.empty(), started_at)
             for chunk in response:
-                if chunk.text:
-                    full_response += chunk.text
-                    response_container.markdown(full_response)
-                    time.sleep(0.05) # Small delay for better streaming effect
-            return full_response
+                renderer.write(chunk.text)
+            full_response = renderer.close()
+            stats = renderer.stats()
+            _record_stream_stats(stats)
         else:
-            return response.text
-
+            full_response = response.text
     except Exception as e:
-        st.error(f"Gemini API 호출 중 오류 발생: {e}")
-        return None 
\ No newline at end of file
+        output.error(f"Gemini API 호출 중 오류 발생: {e}")
+        return None
+
+    if full_response:
+        _save_cached_response(cache_key, full_response)
+    if stats and stats["ttft"] is not None:
+        output.caption(f"⏱️ 첫 응답 {stats['ttft']:.1f}초 · 전체 {stats['total']:.1f}초 · {stats['chars']:,}자")
+    return full_response
+
+
+class RateLimiter:
+    """Spaces out call starts so that at most 'max_per_minute' begin per minute; safe to share between threads."""
+    def __init__(self, max_per_minute):
+        self.interval = 60.0 / max_per_minute if max_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+# --- Map-Reduce Channel Analysis ---
+def estimate_tokens(text):
+    """Rough offline token estimate, used for chunking without an API call."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def split_into_chunks(text, max_tokens):
+    """
+    Splits text at blank lines (video boundaries in the scripts text) into chunks of at most ~max_tokens.
+    A video that fits in a fresh chunk is never split; only videos longer than a whole chunk are cut.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = []
+    current_chars = 0
+    separator = "\n\n"
+    for block in text.split(separator):
+        if not block.strip():
+            continue
+        while block:
+            # 이미 넣은 블록이 있으면 그 사이 구분자도 예산에 포함합니다.
+            needed = len(separator) if current else 0
+            room = max_chars - current_chars - needed
+            if len(block) <= room:
+                current.append(block)
+                current_chars += needed + len(block)
+                break
+            if current and (room <= 0 or len(block) <= max_chars):
+                chunks.append(separator.join(current))
+                current, current_chars = [], 0
+                continue
+            # 한 영상의 대본이 묶음 하나보다 길면 남은 자리만큼 잘라 넣습니다.
+            current.append(block[:room])
+            chunks.append(separator.join(current))
+            current, current_chars = [], 0
+            block = block[room:]
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+def analyze_channel_scripts(st, channel_name, all_scripts, prompt_template, container=None, gemini_slots=None):
+    """
+    Runs the channel analysis prompt over the scripts. Short corpora go to Gemini in one call; long ones
+    are split into token-budgeted chunks that are summarized in parallel (map), and the summaries are
+    then used as the scripts in 'prompt_template' (reduce), which is streamed as usual.
+    'gemini_slots' (e.g. a threading.Semaphore shared between channels) is held around each single
+    Gemini request, map and reduce alike, so it bounds the real number of concurrent requests.
+    """
+    output = container or st
+    slot = gemini_slots if gemini_slots is not None else nullcontext()
+    if estimate_tokens(all_scripts) <= CHANNEL_SINGLE_PASS_TOKENS:
+        final_prompt = prompt_template.format(channel_name=channel_name, all_scripts=all_scripts)
+        with slot:
+            return analyze_with_gemini(st, final_prompt, container=container)
+
+    chunks = split_into_chunks(all_scripts, CHANNEL_CHUNK_TOKENS)
+    progress = output.empty()
+    progress.info(f"🧩 스크립트가 길어 {len(chunks)}개 묶음으로 나누어 요약하는 중...")
+
+    def summarize(index):
+        chunk_prompt = prompts.CHANNEL_CHUNK_SUMMARY_TEMPLATE.format(
+            channel_name=channel_name, chunk_index=index + 1, chunk_count=len(chunks), scripts=chunks[index]
+        )
+        with slot:
+            return analyze_with_gemini(st, chunk_prompt, stream=False, container=container)
+
+    summaries = run_concurrently(st, summarize, range(len(chunks)), CHANNEL_MAP_WORKERS)
+    summaries = [summary for summary in summaries if summary]
+    if not summaries:
+        progress.error("스크립트 요약에 모두 실패했습니다.")
+        return None
+    progress.info(f"🧩 {len(chunks)}개 묶음 중 {len(summaries)}개의 요약으로 채널을 분석합니다.")
+
+    combined = "\n\n".join(f"[요약 {index + 1}]\n{summary}" for index, summary in enumerate(summaries))
+    final_prompt = prompt_template.format(channel_name=channel_name, all_scripts=combined)
+    with slot:
+        return analyze_with_gemini(st, final_prompt, container=container)
+
+# --- Prompt Budgeting ---
+def count_prompt_tokens(st, prompt, model_name=None, use_api=True):
+    """
+    Returns (tokens, exact). With use_api the count comes from the Gemini count_tokens endpoint and is
+    cached per (model, prompt); otherwise, or when the call fails, the offline estimate is used.
+    """
+    if use_api and gemini_utils.get_api_keys(st):
+        model_name = gemini_utils.get_model_name(st, model_name)
+        cache_key = response_cache_key(model_name, GEMINI_SYSTEM_INSTRUCTION, prompt)
+        try:
+            cached = storage_utils.cache_get(TOKEN_COUNT_CACHE_NAMESPACE, cache_key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            return cached, True
+        try:
+            tokens = gemini_utils.count_tokens(st, prompt, GEMINI_SYSTEM_INSTRUCTION, model_name=model_name)
+        except Exception:
+            tokens = None
+        if tokens is not None:
+            try:
+                storage_utils.cache_set(TOKEN_COUNT_CACHE_NAMESPACE, cache_key, tokens, max_entries=TOKEN_COUNT_CACHE_MAX_ENTRIES)
+            except Exception:
+                pass
+            return tokens, True
+    return estimate_tokens(prompt), False
+
+def compact_transcript(text, max_tokens):
+    """Collapses whitespace and repeated caption lines, then keeps the head and tail if it is still too long."""
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if line and (not lines or line != lines[-1]):
+            lines.append(line)
+    compacted = "\n".join(lines)
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(compacted) <= max_chars:
+        return compacted
+    head_chars = int(max_chars * TRANSCRIPT_HEAD_RATIO)
+    tail_chars = max_chars - head_chars
+    return f"{compacted[:head_chars]}\n…(중략)…\n{compacted[-tail_chars:]}"
+
+def select_comments(comments, max_tokens, video_id=None):
+    """
+    Returns 'comments' unchanged when it fits in the budget. Otherwise keeps the most-liked comments
+    that fit, in their original order. When the video's comments are in the local comment store
+    (storage_utils), they are ranked on the stored comment dicts by like count and only formatted
+    afterwards, so numbering or '↳ ' prefixes in 'comments' do not matter; otherwise the first lines
+    of 'comments' that fit are kept.
+    """
+    if estimate_tokens(comments) <= max_tokens:
+        return comments
+
+    stored = list(storage_utils.iter_comments(video_id)) if video_id else []
+    if stored:
+        candidates = [f"↳ {comment['text']}" if comment["parent_id"] else comment["text"] for comment in stored]
+        ranking = sorted(range(len(stored)), key=lambda index: stored[index]["like_count"] or 0, reverse=True)
+    else:
+        candidates = [line for line in comments.splitlines() if line.strip()]
+        ranking = range(len(candidates))
+
+    kept = set()
+    used = 0
+    for index in ranking:
+        tokens = estimate_tokens(candidates[index])
+        if used + tokens > max_tokens:
+            continue
+        kept.add(index)
+        used += tokens
+    selected = [candidates[index] for index in sorted(kept)]
+    return "\n".join(selected) if selected else comments[:max_tokens * CHARS_PER_TOKEN]
+
+def budget_individual_fields(fields, video_id=None, budgets=None):
+    """
+    Fits the script / description / comments of an individual analysis into their token budgets.
+    Returns (budgeted fields, report) where report maps each field to (estimated tokens before, after).
+    """
+    budgets = budgets or INDIVIDUAL_FIELD_BUDGETS
+    budgeted = dict(fields)
+    report = {}
+    for name, max_tokens in budgets.items():
+        value = str(fields.get(name) or "")
+        before = estimate_tokens(value)
+        if name == "script":
+            value = compact_transcript(value, max_tokens)
+        elif name == "comments":
+            value = select_comments(value, max_tokens, video_id)
+        elif before > max_tokens:
+            value = value[:max_tokens * CHARS_PER_TOKEN]
+        budgeted[name] = value
+        report[name] = (before, estimate_tokens(value))
+    return budgeted, report
+
+def format_budget_report(report):
+    """One-line summary of the trimmed fields for the UI."""
+    labels = {"script": "대본", "description": "설명", "comments": "댓글"}
+    parts = [f"{labels.get(name, name)} {before:,}→{after:,}" for name, (before, after) in report.items() if after < before]
+    return f"항목 축약(토큰): {', '.join(parts)}" if parts else "축약된 항목 없음"
@@ -0,0 +1,164 @@
+import io
+import re
+import html
+import time
+import xml.etree.ElementTree as ET
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_TIMING_RE = re.compile(r'<\d{2}:\d{2}:\d{2}\.\d{3}>')
+_VTT_HEADER_PREFIXES = ('WEBVTT', 'KIND:', 'LANGUAGE:', 'NOTE', 'STYLE', 'REGION')
+ROLLING_WINDOW_WORDS = 64  # 롤링 자막 중복을 비교할 최근 단어 수
+
+def _rolling_dedup():
+    """
+    Returns add(line, rolling) that takes a caption line and returns only the text not already emitted.
+    Repeated lines are always dropped. YouTube auto-captions (rolling=True) also repeat the previous
+    line (or part of it) at the start of the next cue, so there the longest overlap between the emitted
+    tail and the new line's prefix is dropped. Manual subtitles keep every word.
+    """
+    tail = []
+    last_line = None
+
+    def add(line, rolling):
+        nonlocal last_line
+        if line == last_line:
+            return ""
+        last_line = line
+
+        words = line.split()
+        if not words:
+            return ""
+        overlap = 0
+        if rolling:
+            first_word = words[0]
+            for k in range(min(len(words), len(tail)), 0, -1):
+                if tail[-k] == first_word and tail[-k:] == words[:k]:
+                    overlap = k
+                    break
+
+        new_words = words[overlap:]
+        if not new_words:
+            return ""
+        tail.extend(new_words)
+        del tail[:-ROLLING_WINDOW_WORDS]
+        return " ".join(new_words)
+
+    return add
+
+def _format_timestamp(cue_start):
+    """'00:01:02.345' -> '[00:01:02]'"""
+    return f"[{cue_start.split('.')[0]}]"
+
+def iter_vtt_lines(lines, keep_timestamps=False, rolling=None):
+    """
+    Yields cleaned transcript lines from an iterable of VTT lines (file object, response, list) in a single pass.
+    Cue headers, numbering, inline timing tags and repeated lines are removed. 'rolling' says whether the
+    track is an auto-caption track whose cues repeat the previous words; None detects it from the
+    word-level timing tags that only auto-captions carry.
+    """
+    add = _rolling_dedup()
+    cue_start = None
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+        if '-->' in line:
+            cue_start = line.split('-->', 1)[0].strip()
+            continue
+        if cue_start is None and line.upper().startswith(_VTT_HEADER_PREFIXES):
+            continue  # 헤더는 첫 큐 이전에만 나옵니다.
+        if line.isdigit():
+            continue
+        if '<' in line:
+            if rolling is None and _WORD_TIMING_RE.search(line):
+                rolling = True
+            line = _TAG_RE.sub('', line).strip()
+        if '&' in line:
+            line = html.unescape(line)
+        if not line:
+            continue
+
+        new_text = add(line, bool(rolling))
+        if new_text:
+            if keep_timestamps and cue_start:
+                yield f"{_format_timestamp(cue_start)} {new_text}"
+            else:
+                yield new_text
+
+def iter_srv3_lines(source, keep_timestamps=False, rolling=None):
+    """
+    Yields cleaned transcript lines from YouTube's SRV3 (timedtext XML) format, parsing incrementally.
+    'rolling' works as in iter_vtt_lines; None detects auto-captions from their word-level <s> segments.
+    """
+    if isinstance(source, str):
+        source = io.BytesIO(source.encode('utf-8'))
+    elif isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    add = _rolling_dedup()
+    for _, elem in ET.iterparse(source, events=('end',)):
+        if elem.tag != 'p':
+            continue
+        line = " ".join("".join(elem.itertext()).split())
+        if rolling is None and elem.find('s') is not None:
+            rolling = True
+        start_ms = int(elem.get('t', 0))
+        elem.clear()
+        if not line:
+            continue
+
+        new_text = add(line, bool(rolling))
+        if new_text:
+            if keep_timestamps:
+                seconds = start_ms // 1000
+                yield f"[{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}] {new_text}"
+            else:
+                yield new_text
+
+def clean_vtt(source, keep_timestamps=False, rolling=None):
+    """Returns the transcript text for VTT content given as a string or an iterable of lines."""
+    if isinstance(source, str):
+        source = source.splitlines()
+    return "\n".join(iter_vtt_lines(source, keep_timestamps, rolling))
+
+def clean_srv3(source, keep_timestamps=False, rolling=None):
+    """Returns the transcript text for SRV3 content given as str, bytes or a binary file object."""
+    return "\n".join(iter_srv3_lines(source, keep_timestamps, rolling))
+
+# --- Micro-benchmark ---
+def _legacy_clean_vtt(vtt_content):
+    """The original list-based cleanup from get_video_transcript, kept for benchmarking only."""
+    lines = vtt_content.splitlines()
+    transcript_lines = [re.sub(r'<[^>]+>', '', line).strip() for line in lines if '-->' not in line and line.strip() and not line.strip().isdigit() and not line.upper().startswith(('WEBVTT', 'KIND:', 'LANGUAGE:'))]
+
+    unique_lines = []
+    for line in transcript_lines:
+        if not unique_lines or unique_lines[-1] != line:
+            unique_lines.append(line)
+    return "\n".join(unique_lines)
+
+def _make_rolling_vtt(cue_count):
+    """Builds a YouTube-style auto-caption VTT where each cue repeats the previous words (rolling captions)."""
+    words = [f"단어{i}" for i in range(cue_count * 3 + 8)]
+    parts = ["WEBVTT", "Kind: captions", "Language: ko", ""]
+    for i in range(cue_count):
+        start = i * 2
+        timing = f"00:{start // 60 % 60:02d}:{start % 60:02d}.000 --> 00:{(start + 2) // 60 % 60:02d}:{(start + 2) % 60:02d}.000 align:start position:0%"
+        previous = " ".join(words[i * 3:i * 3 + 5])
+        current = "<00:00:00.500><c> ".join(words[i * 3 + 2:i * 3 + 8])
+        parts.extend([timing, previous, current, ""])
+    return "\n".join(parts)
+
+def _benchmark(cue_count=50000, repeat=3):
+    vtt_content = _make_rolling_vtt(cue_count)
+    print(f"입력: 큐 {cue_count:,}개, {len(vtt_content):,}자")
+    for name, func in (("legacy", _legacy_clean_vtt), ("streaming", clean_vtt)):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = func(vtt_content)
+            best = min(best, time.perf_counter() - started)
+        print(f"{name:>10}: {best * 1000:8.1f} ms, 출력 {len(output):,}자")
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,90 @@
+import time
+import threading
+import itertools
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+from google.api_core import exceptions as google_exceptions
+
+import quota_utils
+
+GEMINI_MODELS = [
+    "gemini-2.5-pro-preview-06-05",
+    "gemini-2.5-pro",
+    "gemini-2.5-flash",
+]
+DEFAULT_GEMINI_MODEL = GEMINI_MODELS[0]
+RATE_LIMIT_COOLDOWN = 60  # 429를 받은 키를 제외해 두는 시간(초). Gemini 한도는 분 단위로 풀립니다.
+
+_models_lock = threading.Lock()
+_models = {}
+_rotation = itertools.count()
+
+def get_api_keys(st):
+    """Gemini keys of the session: the main key first, then the additional ones, without duplicates."""
+    keys = [st.session_state.get('gemini_api_key', '')] + list(st.session_state.get('gemini_api_keys', []))
+    return list(dict.fromkeys(key for key in keys if key))
+
+def get_model_name(st, model_name=None):
+    return model_name or st.session_state.get('gemini_model') or DEFAULT_GEMINI_MODEL
+
+def get_model(api_key, model_name, system_instruction):
+    """
+    Returns a GenerativeModel for (key, model, system instruction), created once per process.
+    google-generativeai has no public per-model credentials: genai.configure() is global. So configure()
+    only runs under the lock, and the resulting client is pinned to the model right away through its
+    private '_client' attribute, which is why requirements.txt pins the library version. Later
+    configure() calls for other keys do not affect the pinned client.
+    """
+    cache_key = (quota_utils.key_hash(api_key), model_name, system_instruction)
+    with _models_lock:
+        model = _models.get(cache_key)
+        if model is None:
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+            if not hasattr(model, "_client"):
+                # 내부 구조가 바뀐 버전에서는 다른 키로 요청이 나가지 않도록 바로 실패합니다.
+                raise RuntimeError("지원하지 않는 google-generativeai 버전입니다. requirements.txt의 버전을 설치해주세요.")
+            model._client = genai_client.get_default_generative_client()
+            _models[cache_key] = model
+    return model
+
+def _usable_keys(api_keys):
+    """Keys that are not parked, rotated round-robin so concurrent requests spread across them."""
+    usable = [api_key for api_key in api_keys if not quota_utils.get_parked_until(api_key)]
+    if not usable:
+        return []
+    start = next(_rotation) % len(usable)
+    return usable[start:] + usable[:start]
+
+def is_rate_limit_error(error):
+    return isinstance(error, google_exceptions.ResourceExhausted)
+
+def generate_content(st, prompt, system_instruction, model_name=None, stream=False, output=None):
+    """
+    Sends the prompt with the next usable key. A key answered with 429 (rate limit / quota) is
+    parked for RATE_LIMIT_COOLDOWN seconds and the request moves on to the next key.
+    Returns the response object, or None when every key is rate limited.
+    """
+    output = output or st
+    api_keys = get_api_keys(st)
+    model_name = get_model_name(st, model_name)
+    for api_key in _usable_keys(api_keys):
+        model = get_model(api_key, model_name, system_instruction)
+        try:
+            return model.generate_content(prompt, stream=stream)
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                raise
+            quota_utils.park_key(api_key, until=time.time() + RATE_LIMIT_COOLDOWN)
+            output.warning(f"Gemini API 키 {api_keys.index(api_key) + 1}의 요청 한도에 도달해 {RATE_LIMIT_COOLDOWN}초 동안 제외합니다.")
+    output.error("사용 가능한 Gemini API 키가 없습니다. 잠시 후 다시 시도하거나 키를 추가해주세요.")
+    return None
+
+def count_tokens(st, contents, system_instruction, model_name=None):
+    """Token count from the API with the first usable key, or None when no key is available."""
+    api_keys = _usable_keys(get_api_keys(st))
+    if not api_keys:
+        return None
+    model = get_model(api_keys[0], get_model_name(st, model_name), system_instruction)
+    return model.count_tokens(contents).total_tokens
@@ -0,0 +1,327 @@
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import storage_utils
+
+JOB_STATUS_RUNNING = 'running'
+JOB_STATUS_COMPLETED = 'completed'
+JOB_LEASE_SECONDS = 120  # A running job whose heartbeat is older than this is treated as interrupted.
+JOB_HEARTBEAT_SECONDS = 30
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def _get_connection():
+    """Returns the shared SQLite connection, creating the job tables on first use."""
+    global _schema_ready
+    conn = storage_utils.get_connection()
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    plan TEXT,
+                    scan_reports TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    record TEXT NOT NULL,
+                    PRIMARY KEY (job_id, item_key)
+                )
+            """)
+            conn.commit()
+            _schema_ready = True
+    return conn
+
+def _row_to_job(row):
+    job_id, kind, params, status, plan, scan_reports, created_at, updated_at = row
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "params": json.loads(params),
+        "status": status,
+        "plan": json.loads(plan) if plan is not None else None,
+        "scan_reports": json.loads(scan_reports) if scan_reports is not None else [],
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+
+# --- Checkpointed Jobs ---
+def create_job(kind, params):
+    """Registers a new job with its input parameters and returns its ID."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    conn = _get_connection()
+    conn.execute(
+        "INSERT INTO jobs (job_id, kind, params, status, plan, created_at, updated_at) VALUES (?, ?, ?, ?, NULL, ?, ?)",
+        (job_id, kind, json.dumps(params, ensure_ascii=False), JOB_STATUS_RUNNING, now, now)
+    )
+    conn.commit()
+    return job_id
+
+def get_job(job_id):
+    row = _get_connection().execute(
+        "SELECT job_id, kind, params, status, plan, scan_reports, created_at, updated_at FROM jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+    return _row_to_job(row) if row else None
+
+def list_jobs(kind=None, unfinished_only=False):
+    """Returns jobs, newest first, with the number of checkpointed items."""
+    query = "SELECT job_id, kind, params, status, plan, scan_reports, created_at, updated_at FROM jobs WHERE 1 = 1"
+    args = []
+    if kind:
+        query += " AND kind = ?"
+        args.append(kind)
+    if unfinished_only:
+        query += " AND status != ?"
+        args.append(JOB_STATUS_COMPLETED)
+    query += " ORDER BY created_at DESC"
+
+    conn = _get_connection()
+    jobs = [_row_to_job(row) for row in conn.execute(query, args).fetchall()]
+    for job in jobs:
+        job["done_count"] = conn.execute("SELECT COUNT(*) FROM job_items WHERE job_id = ?", (job["job_id"],)).fetchone()[0]
+    return jobs
+
+def save_job_plan(job_id, item_keys):
+    """Stores the ordered list of items (e.g. video IDs) the job has to process."""
+    conn = _get_connection()
+    conn.execute("UPDATE jobs SET plan = ?, updated_at = ? WHERE job_id = ?", (json.dumps(list(item_keys)), time.time(), job_id))
+    conn.commit()
+
+def save_job_scan_reports(job_id, reports):
+    """Stores the channel scan reports (see youtube_utils.get_latest_videos) produced while planning the job."""
+    conn = _get_connection()
+    conn.execute("UPDATE jobs SET scan_reports = ?, updated_at = ? WHERE job_id = ?", (json.dumps(reports, ensure_ascii=False), time.time(), job_id))
+    conn.commit()
+
+def save_job_item(job_id, item_key, record):
+    """Checkpoints one finished item so a resumed job does not fetch it again."""
+    conn = _get_connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO job_items (job_id, item_key, record) VALUES (?, ?, ?)",
+        (job_id, item_key, json.dumps(record, ensure_ascii=False))
+    )
+    conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (time.time(), job_id))
+    conn.commit()
+
+def load_job_items(job_id):
+    """Returns {item_key: record} for everything checkpointed so far."""
+    rows = _get_connection().execute("SELECT item_key, record FROM job_items WHERE job_id = ?", (job_id,)).fetchall()
+    return {item_key: json.loads(record) for item_key, record in rows}
+
+def set_job_status(job_id, status):
+    conn = _get_connection()
+    conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?", (status, time.time(), job_id))
+    conn.commit()
+
+def delete_job(job_id):
+    """Deletes a job and its checkpoints unless it is still held by a live lease. Returns whether it was deleted."""
+    conn = _get_connection()
+    deleted = conn.execute(
+        "DELETE FROM jobs WHERE job_id = ? AND (status = ? OR updated_at < ?)",
+        (job_id, JOB_STATUS_COMPLETED, time.time() - JOB_LEASE_SECONDS)
+    ).rowcount
+    if deleted:
+        conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+    conn.commit()
+    return bool(deleted)
+
+# --- Job Leases ---
+# A running job refreshes its updated_at every JOB_HEARTBEAT_SECONDS. Other sessions (or processes)
+# only see it as interrupted once the heartbeat is older than JOB_LEASE_SECONDS.
+def is_job_live(job):
+    return job["status"] != JOB_STATUS_COMPLETED and time.time() - job["updated_at"] < JOB_LEASE_SECONDS
+
+def claim_job(job_id):
+    """Takes over an interrupted job whose lease has expired. Returns False if another run still holds it."""
+    now = time.time()
+    conn = _get_connection()
+    claimed = conn.execute(
+        "UPDATE jobs SET updated_at = ? WHERE job_id = ? AND status != ? AND updated_at < ?",
+        (now, job_id, JOB_STATUS_COMPLETED, now - JOB_LEASE_SECONDS)
+    ).rowcount
+    conn.commit()
+    return bool(claimed)
+
+def _touch_job(job_id):
+    conn = _get_connection()
+    conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ? AND status != ?", (time.time(), job_id, JOB_STATUS_COMPLETED))
+    conn.commit()
+
+def start_heartbeat(job_id):
+    """Refreshes the job's lease from a daemon thread until the returned event is set."""
+    stop = threading.Event()
+    def beat():
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            _touch_job(job_id)
+    _touch_job(job_id)
+    threading.Thread(target=beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True).start()
+    return stop
+
+# --- Background Job Runner ---
+BACKGROUND_MAX_WORKERS = 4
+BACKGROUND_STATUS_QUEUED = 'queued'
+BACKGROUND_STATUS_RUNNING = 'running'
+BACKGROUND_STATUS_DONE = 'done'
+BACKGROUND_STATUS_FAILED = 'failed'
+BACKGROUND_SESSION_KEYS = ('youtube_api_keys', 'current_api_key_index', 'youtube_client', 'gemini_api_key', 'gemini_api_keys', 'gemini_model', 'gemini_bypass_cache')
+MAX_FINISHED_BACKGROUND_JOBS = 100
+
+_background_executor = ThreadPoolExecutor(max_workers=BACKGROUND_MAX_WORKERS, thread_name_prefix="ytb_any_job")
+_background_jobs = {}
+_background_lock = threading.Lock()
+
+class _JobSessionState(dict):
+    """Dict with attribute access, standing in for st.session_state inside background jobs."""
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+class _JobPlaceholder:
+    """Stand-in for st.empty(): keeps the latest rendered text as the job's partial output; status messages go to the job log."""
+    def __init__(self, job):
+        self._job = job
+
+    def markdown(self, text, **kwargs):
+        self._job["output"] = text
+
+    write = markdown
+
+    def _log(self, level, message):
+        with _background_lock:
+            self._job["messages"].append((level, str(message)))
+
+    def info(self, message, **kwargs):
+        self._log("info", message)
+
+    def success(self, message, **kwargs):
+        self._log("success", message)
+
+    def warning(self, message, **kwargs):
+        self._log("warning", message)
+
+    def error(self, message, **kwargs):
+        self._log("error", message)
+
+class BackgroundStreamlit:
+    """
+    Minimal stand-in for the streamlit module, passed as 'st' to utility functions running in a background job.
+    Messages are recorded in the job log, spinners update the progress text, and the session state
+    is a private snapshot of the keys the job needs.
+    """
+    def __init__(self, job, session_state):
+        self._job = job
+        self.session_state = _JobSessionState(session_state)
+
+    def _log(self, level, message):
+        with _background_lock:
+            self._job["messages"].append((level, str(message)))
+
+    def info(self, message, **kwargs):
+        self._log("info", message)
+
+    def success(self, message, **kwargs):
+        self._log("success", message)
+
+    def warning(self, message, **kwargs):
+        self._log("warning", message)
+
+    def error(self, message, **kwargs):
+        self._log("error", message)
+
+    def write(self, message, **kwargs):
+        self._log("info", message)
+
+    def caption(self, message, **kwargs):
+        self._log("info", message)
+
+    @contextmanager
+    def spinner(self, text="", **kwargs):
+        self._job["progress"] = text
+        yield
+
+    def empty(self):
+        return _JobPlaceholder(self._job)
+
+def snapshot_session_state(session_state, keys=BACKGROUND_SESSION_KEYS):
+    """Copies the session values a background job needs (API keys, clients) out of st.session_state."""
+    return {key: session_state.get(key) for key in keys if key in session_state}
+
+def _run_background_job(job, func, args, kwargs):
+    job["status"] = BACKGROUND_STATUS_RUNNING
+    job["started_at"] = time.time()
+    try:
+        job["result"] = func(BackgroundStreamlit(job, job.pop("session_state")), *args, **kwargs)
+        job["status"] = BACKGROUND_STATUS_DONE
+    except Exception as e:
+        job["error"] = str(e)
+        job["status"] = BACKGROUND_STATUS_FAILED
+    finally:
+        job["finished_at"] = time.time()
+        job["progress"] = ""
+
+def _prune_background_jobs():
+    finished = sorted(
+        (job for job in _background_jobs.values() if job["status"] in (BACKGROUND_STATUS_DONE, BACKGROUND_STATUS_FAILED)),
+        key=lambda job: job["finished_at"] or 0
+    )
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_BACKGROUND_JOBS)]:
+        _background_jobs.pop(job["job_id"], None)
+
+def submit_background_job(kind, label, func, session_state, *args, job_id=None, **kwargs):
+    """
+    Queues func(st, *args, **kwargs) on the shared background pool, where 'st' is a BackgroundStreamlit.
+    'session_state' is a snapshot from snapshot_session_state(). Returns the job ID to poll.
+    """
+    job = {
+        "job_id": job_id or uuid.uuid4().hex,
+        "kind": kind,
+        "label": label,
+        "status": BACKGROUND_STATUS_QUEUED,
+        "progress": "",
+        "messages": [],
+        "output": "",
+        "result": None,
+        "error": None,
+        "submitted_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "session_state": session_state,
+    }
+    with _background_lock:
+        _prune_background_jobs()
+        _background_jobs[job["job_id"]] = job
+    _background_executor.submit(_run_background_job, job, func, args, kwargs)
+    return job["job_id"]
+
+def get_background_job(job_id):
+    """Returns a snapshot of a background job's state, or None if it is unknown (e.g. after a restart)."""
+    with _background_lock:
+        job = _background_jobs.get(job_id)
+        if job is None:
+            return None
+        snapshot = {key: value for key, value in job.items() if key != "session_state"}
+        snapshot["messages"] = list(job["messages"])
+    return snapshot
+
+def forget_background_job(job_id):
+    with _background_lock:
+        _background_jobs.pop(job_id, None)
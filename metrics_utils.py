@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+
+VIEW_BINS = [0, 1000, 100000, 500000, 1000000, float('inf')]
+VIEW_LABELS = ['0-1천', '1천-10만', '10만-50만', '50만-100만', '100만 이상']
+MAX_CACHED_RESULTS = 16
+
+_cache_lock = threading.Lock()
+_cache = OrderedDict()
+
+def _summarize(videos, key):
+    """Per-key totals, means and view-bucket counts in one grouped pass."""
+    grouped = videos.groupby(key, observed=True, sort=False)
+    summary = grouped['일 평균 조회수'].agg(['sum', 'mean', 'size'])
+    summary.columns = ['일 평균 조회수 총합', '영상당 일 평균 조회수', '영상 수']
+    distribution = (
+        grouped['조회수 구간'].value_counts()
+        .unstack(fill_value=0)
+        .reindex(columns=VIEW_LABELS, fill_value=0)
+    )
+    return summary, distribution
+
+def _video_lists(videos, key, columns):
+    """{key: videos sorted by daily views}, split once instead of filtering per key."""
+    ordered = videos.sort_values(by='일 평균 조회수', ascending=False)
+    return {name: frame[columns] for name, frame in ordered.groupby(key, observed=True, sort=False)}
+
+def _compute(df, start_date, end_date, custom_groups, today):
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    videos = df.loc[(df['게시일'] >= start) & (df['게시일'] < end), ['채널명', '제목', '조회수', '게시일']].copy()
+
+    days = (pd.Timestamp(today) - videos['게시일']).dt.days.clip(lower=1)
+    videos['게시 후 일수'] = days
+    videos['일 평균 조회수'] = (videos['조회수'] / days).astype('int64')
+    videos['조회수 구간'] = pd.cut(videos['조회수'], bins=VIEW_BINS, labels=VIEW_LABELS, right=False)
+
+    channel_summary, channel_distribution = _summarize(videos, '채널명')
+
+    # 그룹은 (그룹, 채널) 매핑과 조인해 한 번에 집계합니다. 한 채널이 여러 그룹에 속할 수 있습니다.
+    membership = pd.DataFrame(
+        [(group_name, channel) for group_name, channels in custom_groups for channel in channels],
+        columns=['그룹', '채널명']
+    )
+    index_name = videos.index.name or 'index'
+    grouped_videos = videos.rename_axis(index_name).reset_index().merge(membership, on='채널명', how='inner').set_index(index_name)
+    group_summary, group_distribution = _summarize(grouped_videos, '그룹')
+
+    return {
+        "videos": videos,
+        "total_daily_views": int(videos['일 평균 조회수'].sum()),
+        "channel_summary": channel_summary,
+        "channel_distribution": channel_distribution,
+        "channel_videos": _video_lists(videos, '채널명', ['제목', '조회수', '게시일', '일 평균 조회수']),
+        "group_summary": group_summary,
+        "group_distribution": group_distribution,
+        "group_videos": _video_lists(grouped_videos, '그룹', ['채널명', '제목', '조회수', '게시일', '일 평균 조회수']),
+    }
+
+def compute_view_metrics(df, data_version, start_date, end_date, custom_groups):
+    """
+    Computes daily-average views and per-channel / per-group aggregates for the videos published in
+    [start_date, end_date]. 'df' and 'data_version' come together from video_store.load_versioned_dataframe();
+    results are memoized on the data version, the date range, the group definitions and today's date,
+    and must be treated as read-only.
+    """
+    groups_key = tuple((group_name, tuple(channels)) for group_name, channels in custom_groups.items())
+    today = datetime.now().date()
+    cache_key = (data_version, start_date, end_date, groups_key, today)
+    with _cache_lock:
+        if cache_key in _cache:
+            _cache.move_to_end(cache_key)
+            return _cache[cache_key]
+
+    result = _compute(df, start_date, end_date, groups_key, today)
+    with _cache_lock:
+        _cache[cache_key] = result
+        while len(_cache) > MAX_CACHED_RESULTS:
+            _cache.popitem(last=False)
+    return result
+
+def distribution_table(counts):
+    """Turns one row of a *_distribution frame into the '조회수 구간 / 개수 / 전체 비율' table shown on the page."""
+    total = counts.sum()
+    table = counts.rename_axis('조회수 구간').reset_index(name='개수')
+    ratios = table['개수'] / total * 100 if total else table['개수'] * 0.0
+    table['전체 비율'] = ratios.map(lambda ratio: f"{ratio:.2f}%")
+    return table
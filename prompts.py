@@ -98,6 +98,19 @@ CHANNEL_ANALYSIS_TEMPLATE = """
 {all_scripts}
 """
 
+CHANNEL_CHUNK_SUMMARY_TEMPLATE = """
+다음은 유튜브 채널 '{channel_name}'의 쇼츠 영상 대본 묶음입니다. (전체 {chunk_count}개 묶음 중 {chunk_index}번째)
+이 요약들은 나중에 채널 전체 분석의 입력으로 합쳐지므로, 영상마다 아래 항목만 짧고 구체적으로 정리해주세요.
+- 제목
+- 기-승-전-결 흐름 (각 1문장)
+- 첫 문장의 후킹 방식
+- 어조와 반복 표현, 마무리 문장
+- 주제/소재
+대본을 그대로 옮기지 말고, 번호 목록으로만 답해주세요.
+---
+{scripts}
+"""
+
 DRAMA_ANALYSIS_PROMPT = """당신은 드라마 스토리텔링 전문가입니다. 유튜브 영상의 스크립트와 댓글을 분석하여 다음 항목에 대해 심층적으로 분석해주세요:
 
 1. 이야기 구조 분석: 드라마 영상의 3막 구조와 절정 포인트는 무엇인가?
@@ -0,0 +1,140 @@
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+
+import storage_utils
+
+# YouTube Data API v3 일일 할당량과 메서드별 비용 (https://developers.google.com/youtube/v3/determine_quota_cost)
+DAILY_QUOTA_UNITS = 10000
+DEFAULT_METHOD_COST = 1
+METHOD_COSTS = {
+    'youtube.search.list': 100,
+}
+LOW_QUOTA_THRESHOLD = 500  # 남은 할당량이 이보다 적으면 더 여유 있는 키로 전환
+QUOTA_ERROR_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def _get_connection():
+    """Returns the shared SQLite connection, creating the quota tables on first use."""
+    global _schema_ready
+    conn = storage_utils.get_connection()
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quota_usage (
+                    key_hash TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    units INTEGER NOT NULL,
+                    PRIMARY KEY (key_hash, day)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quota_parked_keys (
+                    key_hash TEXT PRIMARY KEY,
+                    until REAL NOT NULL
+                )
+            """)
+            conn.commit()
+            _schema_ready = True
+    return conn
+
+def _pacific_now():
+    """Current time in US Pacific time, when YouTube quotas reset."""
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo('America/Los_Angeles'))
+    except Exception:
+        # tzdata가 없는 환경(Windows 등)에서는 PST 고정 오프셋으로 대체합니다.
+        return datetime.now(timezone(timedelta(hours=-8)))
+
+def _pacific_day():
+    return _pacific_now().date().isoformat()
+
+def next_reset_timestamp():
+    """Unix timestamp of the next Pacific midnight."""
+    now = _pacific_now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.timestamp()
+
+def key_hash(api_key):
+    """Keys are never stored in plain text; usage is tracked by a short hash."""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+def estimate_cost(method_id):
+    return METHOD_COSTS.get(method_id, DEFAULT_METHOD_COST)
+
+# --- Usage Tracking ---
+def record_usage(api_key, units):
+    conn = _get_connection()
+    conn.execute(
+        "INSERT INTO quota_usage (key_hash, day, units) VALUES (?, ?, ?) "
+        "ON CONFLICT(key_hash, day) DO UPDATE SET units = units + excluded.units",
+        (key_hash(api_key), _pacific_day(), units)
+    )
+    conn.commit()
+
+def get_used_units(api_key):
+    row = _get_connection().execute(
+        "SELECT units FROM quota_usage WHERE key_hash = ? AND day = ?", (key_hash(api_key), _pacific_day())
+    ).fetchone()
+    return row[0] if row else 0
+
+def get_remaining_units(api_key):
+    """Estimated units left today; 0 while the key is parked."""
+    if get_parked_until(api_key):
+        return 0
+    return max(0, DAILY_QUOTA_UNITS - get_used_units(api_key))
+
+# --- Parking Exhausted Keys ---
+def park_key(api_key, until=None):
+    """Takes a key out of rotation until the next quota reset (or 'until')."""
+    conn = _get_connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO quota_parked_keys (key_hash, until) VALUES (?, ?)",
+        (key_hash(api_key), until or next_reset_timestamp())
+    )
+    conn.commit()
+
+def get_parked_until(api_key):
+    """Returns the timestamp until which the key is parked, or None if it is usable."""
+    conn = _get_connection()
+    row = conn.execute("SELECT until FROM quota_parked_keys WHERE key_hash = ?", (key_hash(api_key),)).fetchone()
+    if not row:
+        return None
+    if row[0] <= time.time():
+        conn.execute("DELETE FROM quota_parked_keys WHERE key_hash = ?", (key_hash(api_key),))
+        conn.commit()
+        return None
+    return row[0]
+
+# --- Scheduling ---
+def pick_key_index(api_keys, current_index=None):
+    """
+    Returns the index of the key to use, or None if every key is parked.
+    The current key is kept while it has enough headroom; otherwise the key with the most remaining units wins.
+    """
+    remaining = [get_remaining_units(api_key) for api_key in api_keys]
+    if current_index is not None and 0 <= current_index < len(api_keys) and remaining[current_index] >= LOW_QUOTA_THRESHOLD:
+        return current_index
+
+    candidates = [index for index, api_key in enumerate(api_keys) if not get_parked_until(api_key)]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda index: (remaining[index], index == current_index))
+
+def quota_report(api_keys):
+    """Per-key usage summary for the UI."""
+    report = []
+    for index, api_key in enumerate(api_keys):
+        parked_until = get_parked_until(api_key)
+        report.append({
+            "index": index,
+            "masked_key": f"{api_key[:4]}…{api_key[-4:]}" if len(api_key) > 8 else "****",
+            "used": get_used_units(api_key),
+            "remaining": get_remaining_units(api_key),
+            "parked_until": datetime.fromtimestamp(parked_until) if parked_until else None,
+        })
+    return report
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# 파일 경로를 스크립트 위치 기준으로 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, '.data')
+DB_FILE = os.path.join(DATA_DIR, 'ytb_any.sqlite3')
+
+_thread_local = threading.local()
+_stats_lock = threading.Lock()
+_cache_stats = {}
+
+def get_connection():
+    """Returns this thread's SQLite connection to the local data store (created on first use)."""
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_FILE, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS playlist_items (
+                playlist_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                published_at TEXT,
+                item TEXT NOT NULL,
+                PRIMARY KEY (playlist_id, video_id)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS playlist_sync (
+                playlist_id TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS comments (
+                video_id TEXT NOT NULL,
+                comment_id TEXT NOT NULL,
+                parent_id TEXT,
+                position INTEGER NOT NULL,
+                author TEXT,
+                text TEXT NOT NULL,
+                like_count INTEGER NOT NULL DEFAULT 0,
+                published_at TEXT,
+                PRIMARY KEY (video_id, comment_id)
+            )
+        """)
+        conn.commit()
+        _thread_local.conn = conn
+    return conn
+
+# --- Key-Value Cache ---
+def _record_lookup(namespace, hit):
+    with _stats_lock:
+        stats = _cache_stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+def cache_get(namespace, key, ttl=None):
+    """Returns the cached value, or None on a miss. Entries older than 'ttl' seconds are dropped."""
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+    ).fetchone()
+    now = time.time()
+    if row and ttl is not None and now - row[1] > ttl:
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+        conn.commit()
+        row = None
+    if not row:
+        _record_lookup(namespace, False)
+        return None
+
+    conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+    conn.commit()
+    _record_lookup(namespace, True)
+    return json.loads(row[0])
+
+def cache_set(namespace, key, value, max_bytes=None, max_entries=None):
+    """Stores a JSON-serializable value and evicts least recently used entries beyond the limits."""
+    conn = get_connection()
+    payload = json.dumps(value, ensure_ascii=False)
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (namespace, key, payload, len(payload.encode('utf-8')), now, now)
+    )
+    if max_bytes is not None or max_entries is not None:
+        _evict(conn, namespace, max_bytes, max_entries)
+    conn.commit()
+
+def _evict(conn, namespace, max_bytes, max_entries):
+    entries, total_bytes = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (namespace,)
+    ).fetchone()
+    if (max_entries is None or entries <= max_entries) and (max_bytes is None or total_bytes <= max_bytes):
+        return
+
+    keys_to_delete = []
+    rows = conn.execute(
+        "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at ASC", (namespace,)
+    )
+    for key, size in rows:
+        if (max_entries is None or entries <= max_entries) and (max_bytes is None or total_bytes <= max_bytes):
+            break
+        keys_to_delete.append((namespace, key))
+        entries -= 1
+        total_bytes -= size
+    conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", keys_to_delete)
+
+def cache_delete(namespace, key):
+    conn = get_connection()
+    conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+    conn.commit()
+
+def cache_clear(namespace):
+    conn = get_connection()
+    conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+    conn.commit()
+    with _stats_lock:
+        _cache_stats.pop(namespace, None)
+
+def cache_stats(namespace):
+    """Returns entry count, stored bytes and hit/miss counters (since process start) for a namespace."""
+    entries, total_bytes = get_connection().execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (namespace,)
+    ).fetchone()
+    with _stats_lock:
+        stats = dict(_cache_stats.get(namespace, {"hits": 0, "misses": 0}))
+    lookups = stats["hits"] + stats["misses"]
+    stats.update({
+        "entries": entries,
+        "bytes": total_bytes,
+        "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+    })
+    return stats
+
+# --- Playlist Index ---
+def get_playlist_synced_at(playlist_id):
+    """Returns when the playlist was last fully synced, or None if it never was."""
+    row = get_connection().execute("SELECT synced_at FROM playlist_sync WHERE playlist_id = ?", (playlist_id,)).fetchone()
+    return row[0] if row else None
+
+def load_playlist_video_ids(playlist_id):
+    rows = get_connection().execute("SELECT video_id FROM playlist_items WHERE playlist_id = ?", (playlist_id,))
+    return {row[0] for row in rows}
+
+def load_playlist_items(playlist_id):
+    """Returns the stored playlistItems resources, newest first."""
+    rows = get_connection().execute(
+        "SELECT item FROM playlist_items WHERE playlist_id = ? ORDER BY published_at DESC", (playlist_id,)
+    )
+    return [json.loads(row[0]) for row in rows]
+
+def save_playlist_items(playlist_id, items, replace=False):
+    """Adds playlistItems resources to the index and marks the playlist as synced."""
+    conn = get_connection()
+    if replace:
+        conn.execute("DELETE FROM playlist_items WHERE playlist_id = ?", (playlist_id,))
+    conn.executemany(
+        "INSERT OR REPLACE INTO playlist_items (playlist_id, video_id, published_at, item) VALUES (?, ?, ?, ?)",
+        [
+            (
+                playlist_id,
+                item["snippet"]["resourceId"]["videoId"],
+                item["snippet"].get("publishedAt"),
+                json.dumps(item, ensure_ascii=False),
+            )
+            for item in items
+        ]
+    )
+    conn.execute("INSERT OR REPLACE INTO playlist_sync (playlist_id, synced_at) VALUES (?, ?)", (playlist_id, time.time()))
+    conn.commit()
+
+# --- Comments ---
+def save_comments(video_id, comments, replace=False):
+    """Appends comment dicts (see youtube_utils.iter_comments) for a video, keeping their collection order."""
+    conn = get_connection()
+    if replace:
+        conn.execute("DELETE FROM comments WHERE video_id = ?", (video_id,))
+    start = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM comments WHERE video_id = ?", (video_id,)).fetchone()[0]
+    conn.executemany(
+        "INSERT OR REPLACE INTO comments (video_id, comment_id, parent_id, position, author, text, like_count, published_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                video_id,
+                comment["comment_id"],
+                comment.get("parent_id"),
+                start + offset,
+                comment.get("author"),
+                comment["text"],
+                comment.get("like_count", 0),
+                comment.get("published_at"),
+            )
+            for offset, comment in enumerate(comments)
+        ]
+    )
+    conn.commit()
+
+def iter_comments(video_id, include_replies=True, limit=None):
+    """Yields the stored comments of a video in collection order without loading them all at once."""
+    query = "SELECT comment_id, parent_id, author, text, like_count, published_at FROM comments WHERE video_id = ?"
+    if not include_replies:
+        query += " AND parent_id IS NULL"
+    query += " ORDER BY position"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    for comment_id, parent_id, author, text, like_count, published_at in get_connection().execute(query, (video_id,)):
+        yield {
+            "comment_id": comment_id,
+            "parent_id": parent_id,
+            "author": author,
+            "text": text,
+            "like_count": like_count,
+            "published_at": published_at,
+        }
+
+def count_comments(video_id, include_replies=True):
+    query = "SELECT COUNT(*) FROM comments WHERE video_id = ?"
+    if not include_replies:
+        query += " AND parent_id IS NULL"
+    return get_connection().execute(query, (video_id,)).fetchone()[0]
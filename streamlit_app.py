@@ -4,9 +4,22 @@ import prompts
 import youtube_utils
 import analysis_utils
 import pdf_utils
+import storage_utils
+import job_utils
+import quota_utils
+import gemini_utils
+import video_store
+import metrics_utils
 import matplotlib.pyplot as plt
+import threading
 from datetime import datetime
 
+COLLECTION_JOB_KIND = 'collection'
+CHANNEL_ANALYSIS_JOB_KIND = 'channel_analysis'
+UPLOAD_LIST_JOB_KIND = 'upload_list'
+BACKGROUND_POLL_SECONDS = 2
+MAX_SCAN_REPORT_JOBS = 5  # 채널 스캔 리포트를 보여줄 최근 수집 작업 수
+
 def initialize_app_state():
     """앱의 모든 세션 상태 변수를 초기화합니다."""
     # 페이지 선택
@@ -28,14 +41,20 @@ def initialize_app_state():
         st.session_state.collection_individual_urls = ""
     if 'collection_comment_count' not in st.session_state:
         st.session_state.collection_comment_count = 20
+    if 'collection_include_replies' not in st.session_state:
+        st.session_state.collection_include_replies = False
     if 'collection_script_numbering' not in st.session_state:
         st.session_state.collection_script_numbering = False
     if 'collection_comment_numbering' not in st.session_state:
         st.session_state.collection_comment_numbering = False
-    if 'collected_channel_data' not in st.session_state:
-        st.session_state.collected_channel_data = []
-    if 'collected_individual_data' not in st.session_state:
-        st.session_state.collected_individual_data = []
+    if 'collection_max_workers' not in st.session_state:
+        st.session_state.collection_max_workers = youtube_utils.DEFAULT_MAX_WORKERS
+    if 'collection_max_pages' not in st.session_state:
+        st.session_state.collection_max_pages = 20
+    if 'collection_max_age_days' not in st.session_state:
+        st.session_state.collection_max_age_days = 0
+    if 'collection_in_background' not in st.session_state:
+        st.session_state.collection_in_background = False
 
     # 개별 영상 분석 페이지
     if 'individual_source' not in st.session_state:
@@ -44,6 +63,12 @@ def initialize_app_state():
         st.session_state.individual_url_input = ""
     if 'individual_selected_video' not in st.session_state:
         st.session_state.individual_selected_video = None
+    if 'individual_batch_concurrency' not in st.session_state:
+        st.session_state.individual_batch_concurrency = 3
+    if 'individual_batch_requests_per_minute' not in st.session_state:
+        st.session_state.individual_batch_requests_per_minute = 10
+    if 'individual_batch_results' not in st.session_state:
+        st.session_state.individual_batch_results = {} # 영상 ID -> 분석 결과
 
     # 채널 종합 분석 페이지
     if 'channel_source' not in st.session_state:
@@ -54,6 +79,12 @@ def initialize_app_state():
         st.session_state.channel_analysis_video_count = 5
     if 'channel_selected_channels' not in st.session_state:
         st.session_state.channel_selected_channels = []
+    if 'channel_analysis_in_background' not in st.session_state:
+        st.session_state.channel_analysis_in_background = False
+    if 'channel_analysis_parallel_channels' not in st.session_state:
+        st.session_state.channel_analysis_parallel_channels = 4
+    if 'channel_analysis_gemini_concurrency' not in st.session_state:
+        st.session_state.channel_analysis_gemini_concurrency = 2
 
     # 대본 비교 분석 페이지
     if 'comparison_foreign_script' not in st.session_state:
@@ -64,15 +95,27 @@ def initialize_app_state():
     # 채널 업로드 시간 분석 페이지
     if 'time_analysis_url' not in st.session_state:
         st.session_state.time_analysis_url = ""
+    if 'time_analysis_in_background' not in st.session_state:
+        st.session_state.time_analysis_in_background = False
+    if 'time_analysis_full_refresh' not in st.session_state:
+        st.session_state.time_analysis_full_refresh = False
         
     # 데이터 분석 페이지
-    if 'analysis_data' not in st.session_state:
-        st.session_state.analysis_data = []
+    if 'gemini_model' not in st.session_state:
+        st.session_state.gemini_model = gemini_utils.DEFAULT_GEMINI_MODEL
+    if 'gemini_bypass_cache' not in st.session_state:
+        st.session_state.gemini_bypass_cache = False
     if 'custom_groups' not in st.session_state:
         st.session_state.custom_groups = {}
     if 'analysis_view_mode' not in st.session_state:
         st.session_state.analysis_view_mode = "채널별"
 
+    # 백그라운드 작업
+    if 'background_job_ids' not in st.session_state:
+        st.session_state.background_job_ids = []
+    if 'applied_background_jobs' not in st.session_state:
+        st.session_state.applied_background_jobs = set()
+
     # 테마 모드
     if 'theme_is_dark' not in st.session_state:
         st.session_state.theme_is_dark = True
@@ -171,24 +214,23 @@ def inject_dark_theme_css():
     """
     st.markdown(dark_theme_css, unsafe_allow_html=True)
 
-def render_data_table(title, data_key):
-    """주어진 session_state 키에 대한 데이터 테이블과 관리 버튼을 렌더링합니다."""
-    if not st.session_state.get(data_key):
+def render_data_table(title, bucket):
+    """주어진 데이터 묶음(video_store)에 대한 데이터 테이블과 관리 버튼을 렌더링합니다."""
+    df = video_store.load_dataframe(bucket)
+    if df.empty:
         return
 
     with st.container(border=True):
         st.subheader(title)
         
-        df = pd.DataFrame(st.session_state[data_key])
-        
         df_to_display = df.copy()
         
         # --- 전체 선택 UI ---
         col1, col2, col3 = st.columns([1, 1, 5])
         with col1:
-            select_all_delete = st.checkbox("전체 삭제", key=f"delete_all_{data_key}")
+            select_all_delete = st.checkbox("전체 삭제", key=f"delete_all_{bucket}")
         with col2:
-            select_all_copy = st.checkbox("전체 복사", key=f"copy_all_{data_key}")
+            select_all_copy = st.checkbox("전체 복사", key=f"copy_all_{bucket}")
 
         # --- 데이터 테이블 ---
         df_to_display.insert(0, "삭제", select_all_delete)
@@ -203,35 +245,88 @@ def render_data_table(title, data_key):
                 "분석으로 복사": st.column_config.CheckboxColumn("복사", default=False),
             },
             disabled=df.columns,
-            key=f"{data_key}_editor"
+            key=f"{bucket}_editor"
         )
 
-        indices_to_delete = edited_df[edited_df["삭제"] == True].index.tolist()
-        indices_to_copy = edited_df[edited_df["분석으로 복사"] == True].index.tolist()
+        # 인덱스가 영상 ID입니다.
+        ids_to_delete = edited_df.index[edited_df["삭제"] == True].tolist()
+        ids_to_copy = edited_df.index[edited_df["분석으로 복사"] == True].tolist()
 
         # --- 버튼 로직 ---
         btn_col1, btn_col2 = st.columns(2)
         with btn_col1:
-            if st.button(f"🗑️ 선택한 항목 삭제", type="primary", disabled=not indices_to_delete, key=f"{data_key}_delete_selected"):
-                for index in sorted(indices_to_delete, reverse=True):
-                    del st.session_state[data_key][index]
+            if st.button(f"🗑️ 선택한 항목 삭제", type="primary", disabled=not ids_to_delete, key=f"{bucket}_delete_selected"):
+                video_store.delete_records(bucket, ids_to_delete)
                 st.rerun()
         
         with btn_col2:
-            if st.button(f"➡️ 분석으로 복사", disabled=not indices_to_copy, key=f"{data_key}_copy_selected"):
-                items_to_copy = [st.session_state[data_key][i] for i in indices_to_copy]
+            if st.button(f"➡️ 분석으로 복사", disabled=not ids_to_copy, key=f"{bucket}_copy_selected"):
                 # 이미 분석 데이터에 있는 영상은 제외 (ID 기준)
-                analysis_video_ids = {youtube_utils.get_video_id(item['영상 URL']) for item in st.session_state.analysis_data}
-                new_items_to_copy = [item for item in items_to_copy if youtube_utils.get_video_id(item['영상 URL']) not in analysis_video_ids]
-                
-                st.session_state.analysis_data.extend(new_items_to_copy)
-                
-                copied_count = len(items_to_copy)
-                skipped_count = copied_count - len(new_items_to_copy)
+                copied_count = video_store.copy_records(bucket, video_store.ANALYSIS_BUCKET, ids_to_copy)
+                skipped_count = len(ids_to_copy) - copied_count
                 
-                st.success(f"✅ {len(new_items_to_copy)}개 항목을 분석으로 복사했습니다. (중복 {skipped_count}개 제외)")
+                st.success(f"✅ {copied_count}개 항목을 분석으로 복사했습니다. (중복 {skipped_count}개 제외)")
                 st.rerun()
 
+def apply_background_job_result(job):
+    """완료된 백그라운드 작업의 결과를 현재 세션에 한 번만 반영합니다."""
+    if job["job_id"] in st.session_state.applied_background_jobs:
+        return False
+    st.session_state.applied_background_jobs.add(job["job_id"])
+
+    if job["kind"] == COLLECTION_JOB_KIND:
+        # 결과 저장과 완료 처리는 작업 안에서 끝났으므로 화면만 새로고침합니다.
+        return bool(job["result"])
+    if job["kind"] == UPLOAD_LIST_JOB_KIND and job["result"]:
+        apply_upload_list(job["result"])
+        return True
+    return False
+
+def render_background_jobs():
+    """현재 세션에서 등록한 백그라운드 작업의 진행 상황과 결과를 표시합니다."""
+    job_ids = st.session_state.get('background_job_ids', [])
+    if not job_ids:
+        return
+
+    status_labels = {
+        job_utils.BACKGROUND_STATUS_QUEUED: "⏳ 대기 중",
+        job_utils.BACKGROUND_STATUS_RUNNING: "🔄 실행 중",
+        job_utils.BACKGROUND_STATUS_DONE: "✅ 완료",
+        job_utils.BACKGROUND_STATUS_FAILED: "❌ 실패",
+    }
+    needs_rerun = False
+    with st.expander("🧵 백그라운드 작업", expanded=True):
+        for job_id in reversed(list(job_ids)):
+            job = job_utils.get_background_job(job_id)
+            if job is None: # 앱이 재시작되어 작업 정보가 사라진 경우
+                st.session_state.background_job_ids.remove(job_id)
+                continue
+
+            st.markdown(f"**{job['label']}** · {status_labels.get(job['status'], job['status'])}")
+            if job["progress"]:
+                st.caption(job["progress"])
+            if job["error"]:
+                st.error(f"작업 중 오류가 발생했습니다: {job['error']}")
+            for level, message in job["messages"][-5:]:
+                st.caption(f"[{level}] {message}")
+
+            if job["kind"] == CHANNEL_ANALYSIS_JOB_KIND and (job["output"] or job["result"]):
+                with st.expander("분석 결과 보기", expanded=job["status"] == job_utils.BACKGROUND_STATUS_DONE):
+                    st.markdown(job["result"] or job["output"])
+
+            if job["status"] == job_utils.BACKGROUND_STATUS_DONE:
+                needs_rerun = apply_background_job_result(job) or needs_rerun
+            if job["status"] in (job_utils.BACKGROUND_STATUS_DONE, job_utils.BACKGROUND_STATUS_FAILED):
+                if st.button("목록에서 제거", key=f"forget_background_job_{job_id}"):
+                    st.session_state.background_job_ids.remove(job_id)
+                    job_utils.forget_background_job(job_id)
+                    st.rerun()
+            st.divider()
+        st.button("🔄 진행 상황 새로고침", key="refresh_background_jobs")
+
+    if needs_rerun:
+        st.rerun()
+
 def render_settings_page():
     st.title("⚙️ 설정")
     st.markdown("API 키와 분석 유형을 관리합니다.")
@@ -248,6 +343,9 @@ def render_settings_page():
             value=st.session_state.get("gemini_api_key", ""),
             type="password"
         )
+        for i, key in enumerate(st.session_state.get('gemini_api_keys', [])):
+            st.text_input(f"추가 Gemini 키 {i+1}", value=key, disabled=True, type="password", key=f"gemini_key_disp_{i}")
+        new_gemini_key_input = st.text_input("추가 Gemini API 키 (요청 한도에 걸리면 번갈아 사용)", type="password")
 
         st.markdown("---")
 
@@ -269,6 +367,8 @@ def render_settings_page():
         if submitted:
             # Update session state with form data
             st.session_state.gemini_api_key = gemini_key_input
+            if new_gemini_key_input and new_gemini_key_input not in gemini_utils.get_api_keys(st):
+                st.session_state.gemini_api_keys.append(new_gemini_key_input)
             if new_yt_key_input and new_yt_key_input not in st.session_state.youtube_api_keys:
                 st.session_state.youtube_api_keys.append(new_yt_key_input)
             
@@ -294,9 +394,19 @@ def render_settings_page():
             st.session_state.youtube_api_keys.pop(i)
             st.rerun()
 
+    if st.session_state.get('gemini_api_keys'):
+        st.markdown("#### 추가 Gemini API 키 삭제")
+        for i, key in enumerate(list(st.session_state.gemini_api_keys)):
+            col1, col2 = st.columns([4, 1])
+            col1.text_input(f"추가 Gemini 키 {i+1}", value=key, disabled=True, type="password", key=f"gemini_key_disp_del_{i}")
+            if col2.button("삭제", key=f"del_gemini_key_{i}"):
+                st.session_state.gemini_api_keys.pop(i)
+                st.rerun()
+
     if st.button("⚠️ 현재 세션의 모든 키 삭제"):
         st.session_state.youtube_api_keys = []
         st.session_state.gemini_api_key = ""
+        st.session_state.gemini_api_keys = []
         st.session_state.clients_initialized = False
         st.success("현재 세션의 모든 API 키가 삭제되었습니다.")
         st.rerun()
@@ -304,6 +414,31 @@ def render_settings_page():
 
     st.divider()
 
+    with st.container(border=True):
+        st.subheader("YouTube API 할당량 현황")
+        st.caption(f"키별 일일 할당량 {quota_utils.DAILY_QUOTA_UNITS:,} 단위 기준 추정치입니다. 할당량은 태평양 시간 자정에 초기화됩니다.")
+        youtube_keys = st.session_state.get('youtube_api_keys', [])
+        if youtube_keys:
+            quota_df = pd.DataFrame([
+                {
+                    "키": f"{row['index'] + 1}. {row['masked_key']}",
+                    "사용 (추정)": row["used"],
+                    "남은 할당량 (추정)": row["remaining"],
+                    "상태": f"제외됨 (~{row['parked_until']:%m-%d %H:%M})" if row["parked_until"] else ("사용 중" if row["index"] == st.session_state.current_api_key_index else "대기"),
+                }
+                for row in quota_utils.quota_report(youtube_keys)
+            ])
+            st.dataframe(quota_df, hide_index=True, use_container_width=True)
+        else:
+            st.info("등록된 YouTube API 키가 없습니다.")
+
+    with st.container(border=True):
+        st.subheader("Gemini 모델")
+        st.selectbox("분석에 사용할 모델:", options=gemini_utils.GEMINI_MODELS, key="gemini_model")
+        st.caption("모델을 바꾸면 응답 캐시도 모델별로 따로 저장됩니다.")
+
+    st.divider()
+
     with st.container(border=True):
         st.subheader("기승전결 유형 관리")
         st.info("아래 표에서 직접 유형을 추가, 수정, 삭제할 수 있습니다. 변경 후에는 반드시 '유형 변경사항 저장' 버튼을 눌러주세요.")
@@ -327,6 +462,41 @@ def render_settings_page():
             except Exception as e:
                 st.error(f"유형 저장 중 오류가 발생했습니다: {e}")
 
+    st.divider()
+
+    with st.container(border=True):
+        st.subheader("캐시 관리")
+        transcript_stats = storage_utils.cache_stats(youtube_utils.TRANSCRIPT_CACHE_NAMESPACE)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("저장된 자막 수", f"{transcript_stats['entries']:,}")
+        col2.metric("자막 캐시 크기", f"{transcript_stats['bytes'] / (1024 * 1024):.1f} MB")
+        col3.metric("자막 캐시 적중률", f"{transcript_stats['hit_rate']:.0%}", help=f"적중 {transcript_stats['hits']}회 / 미스 {transcript_stats['misses']}회")
+        if st.button("🧹 자막 캐시 비우기"):
+            storage_utils.cache_clear(youtube_utils.TRANSCRIPT_CACHE_NAMESPACE)
+            st.success("✅ 자막 캐시를 비웠습니다.")
+            st.rerun()
+
+        st.divider()
+        gemini_stats = storage_utils.cache_stats(analysis_utils.GEMINI_CACHE_NAMESPACE)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("저장된 Gemini 응답 수", f"{gemini_stats['entries']:,}")
+        col2.metric("Gemini 캐시 크기", f"{gemini_stats['bytes'] / (1024 * 1024):.1f} MB")
+        col3.metric("Gemini 캐시 적중률", f"{gemini_stats['hit_rate']:.0%}", help=f"적중 {gemini_stats['hits']}회 / 미스 {gemini_stats['misses']}회")
+        st.checkbox("Gemini 응답 캐시 사용 안 함 (항상 새로 분석)", key="gemini_bypass_cache", help="같은 모델·프롬프트로 이미 분석한 결과가 있어도 API를 다시 호출하고 저장된 결과를 갱신합니다.")
+        if st.button("🧹 Gemini 응답 캐시 비우기"):
+            storage_utils.cache_clear(analysis_utils.GEMINI_CACHE_NAMESPACE)
+            st.success("✅ Gemini 응답 캐시를 비웠습니다.")
+            st.rerun()
+
+        stream_stats = [stats for stats in analysis_utils.stream_stats() if stats["ttft"] is not None]
+        if stream_stats:
+            st.divider()
+            stats_df = pd.DataFrame(stream_stats)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("최근 스트리밍 응답 수", f"{len(stats_df):,}")
+            col2.metric("첫 응답까지 (중앙값)", f"{stats_df['ttft'].median():.1f}초")
+            col3.metric("전체 응답 시간 (중앙값)", f"{stats_df['total'].median():.1f}초", help=f"화면 갱신 {stats_df['flushes'].sum():,}회 / 청크 {stats_df['chunks'].sum():,}개")
+
 
 def render_collection_page():
     st.title("📊 스크립트 & 댓글 수집")
@@ -352,10 +522,17 @@ def render_collection_page():
                 st.number_input("채널당 가져올 최대 영상 수:", min_value=1, max_value=50, key="collection_video_count")
             with col2:
                 st.number_input("최소 조회수 (만 단위):", min_value=0, key="collection_min_view_count")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.number_input("채널당 최대 스캔 페이지 (0 = 제한 없음):", min_value=0, key="collection_max_pages", help="페이지당 영상 50개, 약 2 할당량 단위가 사용됩니다.")
+            with col2:
+                st.number_input("최근 N일 이내 영상만 (0 = 제한 없음):", min_value=0, key="collection_max_age_days")
         else:  # 개별 영상
-            st.text_area("영상 URL 목록 (한 줄에 하나씩):", placeholder="https://www.youtube.com/watch?v=...\nhttps://youtu.be/...", key="collection_individual_urls")
+            st.text_area("영상 URL 목록 (한 줄에 하나씩):", placeholder="https://www.youtube.com/watch?v=...\nhttps://youtu.be/...\nhttps://www.youtube.com/shorts/...", key="collection_individual_urls")
 
-        st.number_input("영상당 가져올 최대 댓글 수:", min_value=1, max_value=100, key="collection_comment_count")
+        st.number_input("영상당 가져올 최대 댓글 수:", min_value=1, max_value=5000, key="collection_comment_count", help="100개마다 1 할당량 단위가 사용됩니다.")
+        st.checkbox("답글 포함", key="collection_include_replies", help="답글도 최대 댓글 수에 포함됩니다. 답글이 5개를 넘는 댓글은 추가 요청이 필요합니다.")
+        st.number_input("동시 수집 작업 수:", min_value=1, max_value=32, key="collection_max_workers", help="여러 영상의 정보/자막/댓글을 동시에 수집합니다.")
         
         col1, col2 = st.columns(2)
         with col1:
@@ -363,35 +540,51 @@ def render_collection_page():
         with col2:
             st.checkbox("댓글 번호 붙이기", key="collection_comment_numbering")
     
+        st.checkbox("백그라운드에서 실행 (수집 중에도 다른 작업을 할 수 있습니다)", key="collection_in_background")
         start_button_pressed = st.button("📥 데이터 수집 시작", type="primary")
 
+    render_unfinished_collection_jobs()
+    render_channel_scan_reports()
+
     # --- Data Display and Management ---
-    all_data = st.session_state.get('collected_channel_data', []) + st.session_state.get('collected_individual_data', [])
-    if all_data:
+    has_data = any(video_store.count_records(bucket) for bucket in video_store.COLLECTED_BUCKETS)
+    if has_data:
         st.divider()
+        st.caption("💾 수집 데이터는 로컬 저장소(.data)에 보관되어 앱을 다시 열어도 남아 있으며, 같은 앱에 접속한 모든 사용자가 함께 보고 수정합니다.")
 
-    render_data_table("채널 수집 데이터", "collected_channel_data")
-    render_data_table("개별 영상 수집 데이터", "collected_individual_data")
+    render_data_table("채널 수집 데이터", video_store.CHANNEL_BUCKET)
+    render_data_table("개별 영상 수집 데이터", video_store.INDIVIDUAL_BUCKET)
 
-    if all_data:
+    if has_data:
         st.divider()
         with st.container(border=True):
             st.subheader("종합 데이터 관리")
             col1, col2 = st.columns([1, 1.2])
             with col1:
-                if st.button("💥 전체 데이터 일괄 삭제"):
-                    st.session_state.collected_channel_data = []
-                    st.session_state.collected_individual_data = []
+                # 저장소는 모든 세션이 공유하므로 일괄 삭제는 한 번 더 확인합니다.
+                confirm_clear = st.checkbox("다른 사용자의 수집 데이터도 함께 삭제됨을 확인했습니다", key="confirm_clear_collected_data")
+                if st.button("💥 전체 데이터 일괄 삭제", disabled=not confirm_clear):
+                    for bucket in video_store.COLLECTED_BUCKETS:
+                        video_store.clear_bucket(bucket)
+                    st.session_state.confirm_clear_collected_data = False
                     st.rerun()
             
             with col2:
-                pdf_bytes = pdf_utils.generate_pdf_in_memory(all_data)
-                st.download_button(
-                    label="📄 전체 목록 PDF로 다운로드",
-                    data=pdf_bytes,
-                    file_name="youtube_analysis_report.pdf",
-                    mime="application/pdf"
-                )
+                # 전체 자막/댓글 원문은 PDF를 만들 때만 불러옵니다.
+                data_versions = tuple(video_store.get_version(bucket) for bucket in video_store.COLLECTED_BUCKETS)
+                pdf_export = st.session_state.get('collection_pdf_export')
+                if pdf_export and pdf_export[0] == data_versions:
+                    st.download_button(
+                        label="📄 전체 목록 PDF로 다운로드",
+                        data=pdf_export[1],
+                        file_name="youtube_analysis_report.pdf",
+                        mime="application/pdf"
+                    )
+                elif st.button("📄 PDF 파일 만들기"):
+                    with st.spinner("PDF 생성 중..."):
+                        all_data = [record for bucket in video_store.COLLECTED_BUCKETS for record in video_store.load_records(bucket)]
+                        st.session_state.collection_pdf_export = (data_versions, pdf_utils.generate_pdf_in_memory(all_data))
+                    st.rerun()
     
     # --- Data Collection Logic ---
     if start_button_pressed:
@@ -399,66 +592,285 @@ def render_collection_page():
             urls_input = st.session_state.collection_channel_urls
             video_count = st.session_state.collection_video_count
             min_view_count = st.session_state.collection_min_view_count * 10000
-            target_data_key = 'collected_channel_data'
+            target_data_key = video_store.CHANNEL_BUCKET
         else: # 개별 영상
             urls_input = st.session_state.collection_individual_urls
             video_count = 1
             min_view_count = 0
-            target_data_key = 'collected_individual_data'
-
-        comment_count = st.session_state.collection_comment_count
-        script_numbering = st.session_state.collection_script_numbering
-        comment_numbering = st.session_state.collection_comment_numbering
+            target_data_key = video_store.INDIVIDUAL_BUCKET
 
         urls = [url.strip() for url in urls_input.split('\n') if url.strip()]
         if not urls:
             st.warning("URL을 입력해주세요.")
         else:
-            with st.spinner("데이터를 수집하는 중입니다... (중복 영상은 제외됩니다)"):
-                # 전체 데이터에서 기존 영상 ID 목록을 전달하여 중복 수집 방지
-                all_existing_data = st.session_state.get('collected_channel_data', []) + st.session_state.get('collected_individual_data', [])
-                existing_video_ids = [youtube_utils.get_video_id(item['영상 URL']) for item in all_existing_data]
-                
-                new_results = youtube_utils.process_urls(
-                    st, urls, video_count, min_view_count, comment_count, 
-                    script_numbering, comment_numbering, existing_video_ids
-                )
-            
-            if new_results:
-                st.session_state[target_data_key].extend(new_results)
-                st.success(f"✅ 새로운 영상 {len(new_results)}개를 추가했습니다!", icon="🎉")
+            params = {
+                "urls": urls,
+                "video_count": video_count,
+                "min_view_count": min_view_count,
+                "comment_count": st.session_state.collection_comment_count,
+                "include_replies": st.session_state.collection_include_replies,
+                "script_numbering": st.session_state.collection_script_numbering,
+                "comment_numbering": st.session_state.collection_comment_numbering,
+                "max_workers": st.session_state.collection_max_workers,
+                "scan_options": {
+                    "max_pages": st.session_state.collection_max_pages or None,
+                    "max_age_days": st.session_state.collection_max_age_days or None,
+                },
+                "target_data_key": target_data_key,
+            }
+            job_id = job_utils.create_job(COLLECTION_JOB_KIND, params)
+            if st.session_state.collection_in_background:
+                submit_collection_job(job_id, params)
+                st.rerun()
             else:
-                st.info("✅ 추가할 새로운 영상이 없습니다.", icon="👍")
-            
-            st.rerun()
+                run_collection_job(job_id, params)
 
-def run_individual_analysis(details):
-    st.subheader(f"분석 대상: {details.get('title')}")
-    st.write(f"채널: {details.get('channel_name', '알 수 없음')}, 조회수: {details.get('view_count', '알 수 없음')}")
-    
-    analysis_type = st.selectbox("분석 유형 선택", ["일반", "드라마", "정치"], key=f"analysis_type_{details.get('title')}")
-    
+def run_collection_job(job_id, params):
+    """수집 작업을 실행하거나 중단된 작업을 이어서 실행하고, 결과를 대상 데이터에 추가합니다."""
+    with st.spinner("데이터를 수집하는 중입니다... (중복 영상은 제외됩니다)"):
+        # 전체 데이터에서 기존 영상 ID 목록을 전달하여 중복 수집 방지
+        new_results = _collection_job(st, job_id, params, get_existing_video_ids())
+
+    if new_results:
+        st.success(f"✅ 새로운 영상 {len(new_results)}개를 추가했습니다!", icon="🎉")
+    else:
+        st.info("✅ 추가할 새로운 영상이 없습니다.", icon="👍")
+    st.rerun()
+
+def get_existing_video_ids():
+    return set(video_store.collected_video_ids())
+
+def _collection_job(job_st, job_id, params, existing_video_ids, heartbeat=None):
+    """
+    수집 결과를 대상 데이터에 추가하고 작업을 완료 처리한 뒤, 실제로 추가된 영상을 반환합니다.
+    작업이 끝날 때까지 하트비트로 작업을 점유합니다. 백그라운드 작업은 대기 중에도 점유되도록 등록 시점에 시작한 하트비트를 넘겨받습니다.
+    """
+    heartbeat = heartbeat or job_utils.start_heartbeat(job_id)
+    try:
+        new_results = youtube_utils.process_urls(
+            job_st, params["urls"], params["video_count"], params["min_view_count"], params["comment_count"],
+            params["script_numbering"], params["comment_numbering"], existing_video_ids,
+            max_workers=params["max_workers"], job_id=job_id, scan_options=params.get("scan_options"),
+            include_replies=params.get("include_replies", False)
+        )
+        added = video_store.add_records(params["target_data_key"], new_results) if new_results else []
+        job_utils.set_job_status(job_id, job_utils.JOB_STATUS_COMPLETED)
+        return added
+    finally:
+        heartbeat.set()
+
+def submit_collection_job(job_id, params):
+    """수집 작업을 백그라운드 작업으로 등록합니다. 체크포인트는 같은 job_id로 저장됩니다."""
+    label = f"데이터 수집 (입력 {len(params['urls'])}개)"
+    job_utils.submit_background_job(
+        COLLECTION_JOB_KIND, label, _collection_job, job_utils.snapshot_session_state(st.session_state),
+        job_id, params, get_existing_video_ids(), job_utils.start_heartbeat(job_id), job_id=job_id
+    )
+    st.session_state.background_job_ids.append(job_id)
+
+def render_channel_scan_reports():
+    """최근 수집 작업들의 채널 스캔 페이지 수와 예상 할당량 사용량을 표시합니다. 리포트는 작업 기록에 저장됩니다."""
+    jobs = [job for job in job_utils.list_jobs(COLLECTION_JOB_KIND) if job["scan_reports"]][:MAX_SCAN_REPORT_JOBS]
+    if not jobs:
+        return
+
+    with st.expander("📑 채널 스캔 리포트"):
+        report_df = pd.DataFrame([
+            {
+                "수집 시작": datetime.fromtimestamp(job["created_at"]).strftime("%Y-%m-%d %H:%M"),
+                "채널": report.get("channel_title", report["channel_id"]),
+                "스캔 페이지": report["pages_scanned"],
+                "확인한 영상": report["videos_checked"],
+                "찾은 영상": report["found"],
+                "예상 할당량": report["quota_units"],
+                "종료 사유": report["stop_reason"],
+            }
+            for job in jobs for report in job["scan_reports"]
+        ])
+        st.dataframe(report_df, hide_index=True, use_container_width=True)
+        st.caption(f"예상 할당량 합계: {report_df['예상 할당량'].sum():,} 단위")
+
+def render_unfinished_collection_jobs():
+    """중단된 수집 작업 목록과 이어서 수집/삭제 버튼을 렌더링합니다."""
+    unfinished_jobs = [
+        job for job in job_utils.list_jobs(COLLECTION_JOB_KIND, unfinished_only=True)
+        if not job_utils.is_job_live(job) # 다른 세션이나 백그라운드에서 실행 중인 작업은 제외
+    ]
+    if not unfinished_jobs:
+        return
+
+    with st.container(border=True):
+        st.subheader("⏸️ 중단된 수집 작업")
+        st.caption("새로고침이나 오류로 중단된 작업입니다. 이어서 수집하면 이미 받은 영상은 다시 가져오지 않습니다.")
+        for job in unfinished_jobs:
+            params = job["params"]
+            planned = len(job["plan"]) if job["plan"] is not None else "?"
+            started_at = datetime.fromtimestamp(job["created_at"]).strftime("%Y-%m-%d %H:%M")
+            col1, col2, col3 = st.columns([4, 1, 1])
+            col1.write(f"{started_at} · 입력 {len(params['urls'])}개 · 진행 {job['done_count']}/{planned}")
+            if col2.button("▶️ 이어서 수집", key=f"resume_job_{job['job_id']}"):
+                if not job_utils.claim_job(job["job_id"]):
+                    st.warning("다른 세션에서 이미 이 작업을 이어서 수집하고 있습니다.")
+                elif st.session_state.collection_in_background:
+                    submit_collection_job(job["job_id"], params)
+                    st.rerun()
+                else:
+                    run_collection_job(job["job_id"], params)
+            if col3.button("삭제", key=f"delete_job_{job['job_id']}"):
+                if job_utils.delete_job(job["job_id"]):
+                    st.rerun()
+                else:
+                    st.warning("다른 세션에서 실행 중인 작업은 삭제할 수 없습니다.")
+
+INDIVIDUAL_ANALYSIS_TYPES = ["일반", "드라마", "정치"]
+
+def get_individual_prompt_template(analysis_type):
     if analysis_type == "일반":
-        prompt_template = prompts.INDIVIDUAL_ANALYSIS_TEMPLATE
+        return prompts.INDIVIDUAL_ANALYSIS_TEMPLATE
     elif analysis_type == "드라마":
-        prompt_template = prompts.DRAMA_ANALYSIS_PROMPT
+        return prompts.DRAMA_ANALYSIS_PROMPT
     else: # 정치
-        prompt_template = prompts.POLITICS_ANALYSIS_PROMPT
+        return prompts.POLITICS_ANALYSIS_PROMPT
+
+def get_individual_analysis_fields(details):
+    """수집 레코드(한글 키)와 PDF 입력(영문 키)을 프롬프트 입력 항목으로 맞춥니다."""
+    video_url = details.get('영상 URL')
+    return {
+        "video_id": youtube_utils.get_video_id(video_url) if video_url else None,
+        "title": details.get('제목', details.get('title', '')),
+        "script": details.get('자막', details.get('script', '')),
+        "description": details.get('설명', details.get('description', '')),
+        "comments": details.get('댓글', details.get('comments', '')),
+        "channel_name": details.get('채널명', details.get('channel_name', '알 수 없음')),
+        "view_count": details.get('조회수', details.get('view_count', '알 수 없음')),
+    }
 
-    dynamic_prompt = prompts.create_dynamic_prompt(prompt_template)
+def run_individual_analysis(details):
+    fields = get_individual_analysis_fields(details)
+    st.subheader(f"분석 대상: {fields['title']}")
+    st.write(f"채널: {fields['channel_name']}, 조회수: {fields['view_count']}")
+    
+    analysis_type = st.selectbox("분석 유형 선택", INDIVIDUAL_ANALYSIS_TYPES, key=f"analysis_type_{fields['title']}")
+    dynamic_prompt = prompts.create_dynamic_prompt(get_individual_prompt_template(analysis_type))
     
     with st.expander("프롬프트 수정/확인"):
-        edited_prompt = st.text_area("분석 프롬프트:", value=dynamic_prompt, height=300, key=f"prompt_editor_{details.get('title')}")
+        edited_prompt = st.text_area("분석 프롬프트:", value=dynamic_prompt, height=300, key=f"prompt_editor_{fields['title']}")
+
+    budgeted, budget_report = analysis_utils.budget_individual_fields(fields, video_id=fields['video_id'])
+    final_prompt_text = edited_prompt.format(
+        title=budgeted['title'],
+        script=budgeted['script'],
+        description=budgeted['description'],
+        comments=budgeted['comments']
+    )
+    prompt_tokens, exact = analysis_utils.count_prompt_tokens(st, final_prompt_text)
+    st.caption(f"🔢 입력 토큰 {'' if exact else '약 '}{prompt_tokens:,}개 · {analysis_utils.format_budget_report(budget_report)}")
 
     with st.spinner("🤖 Gemini API로 분석 중..."):
-        final_prompt_text = edited_prompt.format(
-            title=details.get('title', ''),
-            script=details.get('script', ''),
-            description=details.get('description', ''),
-            comments=details.get('comments', '')
-        )
         analysis_utils.analyze_with_gemini(st, final_prompt_text)
-        st.success(f"✅ '{details.get('title')}' 영상 분석이 완료되었습니다!", icon="🔎")
+        st.success(f"✅ '{fields['title']}' 영상 분석이 완료되었습니다!", icon="🔎")
+
+def run_individual_batch_analysis(urls, analysis_type, prompt_template):
+    """
+    여러 영상을 한 번에 분석합니다. 영상 정보는 병렬로 가져오고, Gemini 요청은 동시 요청 수와
+    분당 요청 수 제한 안에서 보냅니다. 결과는 영상별로 individual_batch_results에 바로 저장됩니다.
+    """
+    video_ids = []
+    for url in urls:
+        video_id = youtube_utils.get_video_id(url)
+        if not video_id:
+            st.error(f"올바른 유튜브 영상 URL이 아닙니다: {url}")
+        elif video_id not in video_ids:
+            video_ids.append(video_id)
+    if not video_ids:
+        return
+
+    with st.spinner("영상 정보 일괄 조회 중..."):
+        metadata_by_id = youtube_utils.get_videos_metadata(st, video_ids) or {}
+
+    results = st.session_state.individual_batch_results
+    status_by_id = {}
+    with st.container(border=True):
+        st.write(f"영상 {len(video_ids)}개 일괄 분석")
+        for video_id in video_ids:
+            status_by_id[video_id] = st.empty()
+            status_by_id[video_id].write(f"⏳ 대기 중: {video_id}")
+
+    gemini_slots = threading.Semaphore(st.session_state.individual_batch_concurrency)
+    rate_limiter = analysis_utils.RateLimiter(st.session_state.individual_batch_requests_per_minute)
+
+    def analyze(video_id):
+        status = status_by_id[video_id]
+        status.write(f"📥 영상 정보 수집 중: {video_id}")
+        details = youtube_utils.get_video_details(st, video_id, 20, metadata=metadata_by_id.get(video_id))
+        if not details:
+            status.error(f"영상 정보를 가져올 수 없습니다: {video_id}")
+            return
+        fields, _ = analysis_utils.budget_individual_fields(get_individual_analysis_fields(details), video_id=video_id)
+        final_prompt = prompt_template.format(
+            title=fields['title'],
+            script=fields['script'],
+            description=fields['description'],
+            comments=fields['comments']
+        )
+        prompt_tokens = analysis_utils.estimate_tokens(final_prompt)
+
+        with gemini_slots:
+            rate_limiter.wait()
+            status.write(f"🤖 분석 중: {fields['title']}")
+            analysis = analysis_utils.analyze_with_gemini(st, final_prompt, stream=False, container=status)
+        results[video_id] = {
+            "title": fields['title'],
+            "channel_name": fields['channel_name'],
+            "url": details.get('영상 URL'),
+            "analysis_type": analysis_type,
+            "analysis": analysis,
+            "prompt_tokens": prompt_tokens,
+            "analyzed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if analysis:
+            status.success(f"✅ 분석 완료: {fields['title']}")
+
+    # 동시 Gemini 요청 수보다 넉넉하게 작업을 돌려 영상 정보 수집이 분석과 겹치도록 합니다.
+    max_workers = st.session_state.individual_batch_concurrency * 2
+    with st.spinner(f"영상 {len(video_ids)}개 분석 중..."):
+        youtube_utils.run_concurrently(st, analyze, video_ids, max_workers)
+    done_count = sum(1 for video_id in video_ids if results.get(video_id, {}).get("analysis"))
+    st.success(f"✅ 일괄 분석 완료: {done_count}/{len(video_ids)}개", icon="🔎")
+
+def render_individual_batch_results():
+    """일괄 분석 결과를 영상별로 표시하고 내보내기 버튼을 제공합니다."""
+    results = st.session_state.individual_batch_results
+    if not results:
+        return
+
+    with st.container(border=True):
+        st.subheader(f"📚 일괄 분석 결과 ({len(results)}개)")
+        for video_id, result in results.items():
+            label = f"{result['title']} ({result['analysis_type']})" if result['analysis'] else f"❌ {result['title']} (분석 실패)"
+            with st.expander(label):
+                st.caption(f"채널: {result['channel_name']} · {result['url']} · {result['analyzed_at']} · 입력 토큰 약 {result.get('prompt_tokens', 0):,}개")
+                st.markdown(result['analysis'] or "분석 결과가 없습니다.")
+
+        markdown_export = "\n\n---\n\n".join(
+            f"# {result['title']}\n\n- 채널: {result['channel_name']}\n- URL: {result['url']}\n- 분석 유형: {result['analysis_type']}\n\n{result['analysis'] or ''}"
+            for result in results.values()
+        )
+        csv_export = pd.DataFrame([
+            {"영상 ID": video_id, "제목": result['title'], "채널명": result['channel_name'], "영상 URL": result['url'],
+             "분석 유형": result['analysis_type'], "분석 시각": result['analyzed_at'], "분석 결과": result['analysis']}
+            for video_id, result in results.items()
+        ]).to_csv(index=False).encode('utf-8-sig')
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("📝 Markdown으로 내보내기", data=markdown_export, file_name="individual_analysis.md", mime="text/markdown")
+        with col2:
+            st.download_button("📊 CSV로 내보내기", data=csv_export, file_name="individual_analysis.csv", mime="text/csv")
+        with col3:
+            if st.button("🧹 일괄 분석 결과 지우기"):
+                st.session_state.individual_batch_results = {}
+                st.rerun()
 
 def render_individual_analysis_page():
     st.title("🔎 개별 영상 분석")
@@ -471,17 +883,37 @@ def render_individual_analysis_page():
         with st.container(border=True):
             st.subheader("🌐 URL로 분석")
             st.text_area("분석할 영상 URL (한 줄에 하나씩):", key="individual_url_input")
+            urls = [url.strip() for url in st.session_state.individual_url_input.split('\n') if url.strip()]
+
+            # URL이 여러 개면 분석 유형과 프롬프트를 먼저 정하고 일괄 분석합니다.
+            if len(urls) > 1:
+                batch_analysis_type = st.selectbox("분석 유형 선택 (일괄 분석)", INDIVIDUAL_ANALYSIS_TYPES, key="individual_batch_analysis_type")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.number_input("동시 Gemini 요청 수:", min_value=1, max_value=8, key="individual_batch_concurrency")
+                with col2:
+                    st.number_input("분당 최대 Gemini 요청 수:", min_value=1, max_value=120, key="individual_batch_requests_per_minute")
+                with st.expander("프롬프트 수정/확인 (일괄 분석)"):
+                    batch_prompt = st.text_area(
+                        "분석 프롬프트:",
+                        value=prompts.create_dynamic_prompt(get_individual_prompt_template(batch_analysis_type)),
+                        height=300,
+                        key=f"individual_batch_prompt_{batch_analysis_type}"
+                    )
+
             if st.button("🚀 URL로 분석 시작", type="primary"):
-                urls_input = st.session_state.individual_url_input
-                urls = [url.strip() for url in urls_input.split('\n') if url.strip()]
                 if not urls:
                     st.warning("분석할 영상 URL을 입력해주세요.")
+                elif len(urls) > 1:
+                    run_individual_batch_analysis(urls, batch_analysis_type, batch_prompt)
                 else:
-                    for url in urls:
+                    video_ids = [youtube_utils.get_video_id(url) for url in urls]
+                    with st.spinner("영상 정보 일괄 조회 중..."):
+                        metadata_by_id = youtube_utils.get_videos_metadata(st, [video_id for video_id in video_ids if video_id]) or {}
+                    for url, video_id in zip(urls, video_ids):
                         with st.spinner(f"영상 정보 수집 중: {url}"):
-                            video_id = youtube_utils.get_video_id(url)
                             if video_id:
-                                details = youtube_utils.get_video_details(st, video_id, 20)
+                                details = youtube_utils.get_video_details(st, video_id, 20, metadata=metadata_by_id.get(video_id))
                                 if details:
                                     run_individual_analysis(details)
                             else: 
@@ -490,9 +922,13 @@ def render_individual_analysis_page():
     elif st.session_state.individual_source == "수집된 데이터":
         with st.container(border=True):
             st.subheader("📊 수집된 데이터로 분석")
-            all_collected_data = st.session_state.get('collected_channel_data', []) + st.session_state.get('collected_individual_data', [])
-            if all_collected_data:
-                video_options = {f"{i+1}. {item.get('제목', '제목 없음')}": item for i, item in enumerate(all_collected_data)}
+            collected_titles = [
+                (bucket, video_id, title)
+                for bucket in video_store.COLLECTED_BUCKETS
+                for video_id, title in video_store.load_dataframe(bucket)['제목'].items()
+            ]
+            if collected_titles:
+                video_options = {f"{i+1}. {title or '제목 없음'}": (bucket, video_id) for i, (bucket, video_id, title) in enumerate(collected_titles)}
                 
                 # Get the index for the selectbox
                 options_list = list(video_options.keys())
@@ -502,7 +938,8 @@ def render_individual_analysis_page():
                 if st.button("🚀 선택한 데이터로 분석 시작", type="primary"):
                     selected_title = st.session_state.individual_selected_video
                     if selected_title:
-                        selected_video = video_options[selected_title]
+                        bucket, video_id = video_options[selected_title]
+                        selected_video = video_store.load_records(bucket, video_ids=[video_id])[0]
                         run_individual_analysis(selected_video)
             else:
                 st.warning("'스크립트 & 댓글 수집' 탭에서 먼저 데이터를 수집해주세요.")
@@ -518,31 +955,22 @@ def render_individual_analysis_page():
                         details = { "title": uploaded_file.name, "script": script_text, "description": "", "comments": "" }
                         run_individual_analysis(details)
 
+    render_individual_batch_results()
+
 def run_channel_analysis(url=None, video_count=None, channel_name=None, pdf_file=None, collected_data=None):
+    """채널 하나를 분석합니다. 여러 채널은 run_multi_channel_analysis로 동시에 분석합니다."""
     all_scripts_text = ""
     display_name = ""
 
     with st.spinner(f"데이터 준비 중..."):
         if url:
-            display_name = url
-            channel_id = youtube_utils.get_channel_id(st, url)
-            if channel_id:
-                channel_info = youtube_utils.get_channel_info(st, channel_id)
-                display_name = channel_info.get('snippet', {}).get('title', url)
-                videos = youtube_utils.get_latest_videos(st, channel_id, video_count, 0)
-                for video in videos:
-                    details = youtube_utils.get_video_details(st, video['videoId'], 5)
-                    if details and details.get('자막', '자막 없음') not in ["자막 없음", "자막 추출 오류"]:
-                        all_scripts_text += f"제목: {details['제목']}\n대본: {details['자막']}\n\n"
-            else:
+            display_name, all_scripts_text = youtube_utils.collect_channel_scripts(st, url, video_count)
+            if display_name is None:
                 st.error(f"채널 ID를 찾을 수 없습니다: {url}")
                 return
         
         elif channel_name:
-            display_name = channel_name
-            for item in collected_data:
-                if item.get("채널명") == channel_name and item.get('자막', '자막 없음') not in ["자막 없음", "자막 추출 오류"]:
-                    all_scripts_text += f"제목: {item.get('제목', '')}\n대본: {item.get('자막', '')}\n\n"
+            display_name, all_scripts_text = collected_channel_scripts(channel_name, collected_data)
 
         elif pdf_file:
             display_name = pdf_file.name
@@ -560,10 +988,79 @@ def run_channel_analysis(url=None, video_count=None, channel_name=None, pdf_file
         edited_prompt = st.text_area("분석 프롬프트:", value=dynamic_prompt, height=300, key=f"channel_editor_{display_name}")
     
     with st.spinner(f"🤖 '{display_name}' 채널 분석 중..."):
-        final_prompt = edited_prompt.format(channel_name=display_name, all_scripts=all_scripts_text)
-        analysis_utils.analyze_with_gemini(st, final_prompt)
+        analysis_utils.analyze_channel_scripts(st, display_name, all_scripts_text, edited_prompt)
         st.success(f"✅ '{display_name}' 채널 분석이 완료되었습니다!", icon="📈")
 
+def collected_channel_scripts(channel_name, collected_data=None):
+    """수집된 데이터에서 채널의 자막을 모아 (채널명, 스크립트 텍스트)로 반환합니다."""
+    if collected_data is None:
+        collected_data = [record for bucket in video_store.COLLECTED_BUCKETS for record in video_store.load_records(bucket, channel=channel_name)]
+    all_scripts_text = "".join(
+        f"제목: {item.get('제목', '')}\n대본: {item.get('자막', '')}\n\n"
+        for item in collected_data
+        if item.get("채널명") == channel_name and item.get('자막', '자막 없음') not in youtube_utils.NO_TRANSCRIPT_RESULTS
+    )
+    return channel_name, all_scripts_text
+
+def run_multi_channel_analysis(sources, prompt_template):
+    """
+    여러 채널을 동시에 분석합니다. sources는 (표시 이름, 데이터 로더) 목록이며,
+    로더는 (채널명 또는 None, 스크립트 텍스트)를 반환합니다. 채널별 패널은 입력 순서대로 먼저 만들고,
+    데이터 수집은 채널 단위로 병렬 실행하되 Gemini 요청은 설정한 개수만큼만 동시에 보냅니다.
+    """
+    panels = []
+    for label, _ in sources:
+        panel = st.container(border=True)
+        panel.subheader(f"'{label}' 채널 분석 결과")
+        status = panel.empty()
+        status.info("⏳ 대기 중...")
+        panels.append((panel, status))
+
+    gemini_slots = threading.Semaphore(st.session_state.channel_analysis_gemini_concurrency)
+
+    def analyze(index):
+        (label, load), (panel, status) = sources[index], panels[index]
+        status.info("📥 데이터 준비 중...")
+        display_name, all_scripts_text = load()
+        if display_name is None:
+            status.error(f"채널 ID를 찾을 수 없습니다: {label}")
+            return None
+        if not all_scripts_text:
+            status.warning(f"'{display_name}'에서 분석할 스크립트를 찾지 못했습니다.")
+            return None
+
+        status.info(f"🤖 '{display_name}' 채널 분석 중... (Gemini 요청은 동시에 최대 {st.session_state.channel_analysis_gemini_concurrency}개)")
+        # 세마포어는 요약(map)과 최종 분석(reduce)의 Gemini 요청마다 따로 잡습니다.
+        result = analysis_utils.analyze_channel_scripts(st, display_name, all_scripts_text, prompt_template, container=panel, gemini_slots=gemini_slots)
+        if result:
+            status.success(f"✅ '{display_name}' 채널 분석이 완료되었습니다!", icon="📈")
+        else:
+            status.error(f"'{display_name}' 채널 분석에 실패했습니다.")
+        return result
+
+    with st.spinner(f"채널 {len(sources)}개 분석 중..."):
+        youtube_utils.run_concurrently(st, analyze, range(len(sources)), st.session_state.channel_analysis_parallel_channels)
+
+def render_multi_channel_settings():
+    col1, col2 = st.columns(2)
+    with col1:
+        st.number_input("동시에 처리할 채널 수:", min_value=1, max_value=16, key="channel_analysis_parallel_channels", help="여러 채널을 선택한 경우 채널 데이터 수집을 동시에 진행합니다.")
+    with col2:
+        st.number_input("동시 Gemini 요청 수:", min_value=1, max_value=8, key="channel_analysis_gemini_concurrency")
+
+def _channel_analysis_job(job_st, url, video_count, prompt_template):
+    with job_st.spinner("데이터 준비 중..."):
+        display_name, all_scripts_text = youtube_utils.collect_channel_scripts(job_st, url, video_count)
+    if display_name is None:
+        job_st.error(f"채널 ID를 찾을 수 없습니다: {url}")
+        return None
+    if not all_scripts_text:
+        job_st.warning(f"'{display_name}'에서 분석할 스크립트를 찾지 못했습니다.")
+        return None
+
+    with job_st.spinner(f"🤖 '{display_name}' 채널 분석 중..."):
+        return analysis_utils.analyze_channel_scripts(job_st, display_name, all_scripts_text, prompt_template)
+
 def render_channel_analysis_page():
     st.title("📈 채널 종합 분석")
     st.markdown("분석 소스를 선택하고 URL을 입력하거나, 수집된 데이터 또는 PDF 파일을 선택하세요.")
@@ -576,6 +1073,13 @@ def render_channel_analysis_page():
             st.subheader("🌐 URL로 분석")
             st.text_area("분석할 채널 URL (한 줄에 하나씩):", key="channel_url_input")
             st.number_input("채널당 분석할 최신 영상 수:", min_value=1, max_value=50, key="channel_analysis_video_count")
+            st.checkbox("백그라운드에서 실행 (채널별로 작업이 등록됩니다)", key="channel_analysis_in_background")
+            render_multi_channel_settings()
+
+            # 백그라운드 작업과 여러 채널 동시 분석은 시작 전에 정한 프롬프트 하나를 함께 사용합니다.
+            dynamic_prompt = prompts.create_dynamic_prompt(prompts.CHANNEL_ANALYSIS_TEMPLATE)
+            with st.expander("프롬프트 수정/확인 (백그라운드/여러 채널 분석)"):
+                shared_prompt = st.text_area("분석 프롬프트:", value=dynamic_prompt, height=300, key="channel_background_prompt_editor")
             
             if st.button("🚀 채널 분석 시작 (URL)", type="primary"):
                 urls_input = st.session_state.channel_url_input
@@ -583,26 +1087,47 @@ def render_channel_analysis_page():
                 urls = [url.strip() for url in urls_input.split('\n') if url.strip()]
                 if not urls:
                     st.warning("채널 URL을 입력해주세요.")
-                else:
+                elif st.session_state.channel_analysis_in_background:
                     for url in urls:
-                        run_channel_analysis(url=url, video_count=video_count)
+                        job_id = job_utils.submit_background_job(
+                            CHANNEL_ANALYSIS_JOB_KIND, f"채널 분석: {url}", _channel_analysis_job,
+                            job_utils.snapshot_session_state(st.session_state), url, video_count, shared_prompt
+                        )
+                        st.session_state.background_job_ids.append(job_id)
+                    st.rerun()
+                elif len(urls) > 1:
+                    run_multi_channel_analysis(
+                        [(url, lambda url=url: youtube_utils.collect_channel_scripts(st, url, video_count)) for url in urls],
+                        shared_prompt
+                    )
+                else:
+                    run_channel_analysis(url=urls[0], video_count=video_count)
 
     elif st.session_state.channel_source == "수집된 데이터":
         with st.container(border=True):
             st.subheader("📊 수집된 데이터로 분석")
             st.info("'스크립트 & 댓글 수집' 탭에서 가져온 데이터를 채널별로 선택하여 종합 분석합니다.")
-            all_collected_data = st.session_state.get('collected_channel_data', []) + st.session_state.get('collected_individual_data', [])
-            if all_collected_data:
-                all_channels = sorted(list(set(item.get("채널명", "알 수 없는 채널") for item in all_collected_data)))
+            collected_frames = [video_store.load_dataframe(bucket) for bucket in video_store.COLLECTED_BUCKETS]
+            if any(not df.empty for df in collected_frames):
+                all_channels = sorted(set().union(*(df['채널명'].fillna("알 수 없는 채널") for df in collected_frames)))
                 st.multiselect("분석할 채널을 선택하세요:", options=all_channels, key="channel_selected_channels")
+                if len(st.session_state.channel_selected_channels) > 1:
+                    render_multi_channel_settings()
+                    dynamic_prompt = prompts.create_dynamic_prompt(prompts.CHANNEL_ANALYSIS_TEMPLATE)
+                    with st.expander("프롬프트 수정/확인 (여러 채널 분석)"):
+                        shared_prompt = st.text_area("분석 프롬프트:", value=dynamic_prompt, height=300, key="channel_collected_prompt_editor")
 
                 if st.button("🚀 선택한 채널 종합 분석 시작", type="primary"):
                     selected_channels = st.session_state.channel_selected_channels
                     if not selected_channels:
                         st.warning("분석할 채널을 하나 이상 선택해주세요.")
+                    elif len(selected_channels) > 1:
+                        run_multi_channel_analysis(
+                            [(channel_name, lambda channel_name=channel_name: collected_channel_scripts(channel_name)) for channel_name in selected_channels],
+                            shared_prompt
+                        )
                     else:
-                        for channel_name in selected_channels:
-                            run_channel_analysis(channel_name=channel_name, collected_data=all_collected_data)
+                        run_channel_analysis(channel_name=selected_channels[0])
             else:
                 st.warning("'스크립트 & 댓글 수집' 탭에서 먼저 데이터를 수집해주세요.")
 
@@ -649,34 +1174,59 @@ def render_comparison_page():
             analysis_utils.analyze_with_gemini(st, final_prompt)
             st.success("✅ 대본 비교 분석이 완료되었습니다!", icon="🔄")
 
+def _upload_list_job(job_st, channel_url, full_refresh=False):
+    channel_id = youtube_utils.get_channel_id(job_st, channel_url)
+    if not channel_id:
+        job_st.error("채널 ID를 찾을 수 없습니다.")
+        return None
+
+    if full_refresh:
+        youtube_utils.invalidate_channel_info(channel_id)
+    channel_info = youtube_utils.get_channel_info(job_st, channel_id, include_statistics=False) or {}
+    uploads_playlist_id = channel_info.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+    if not uploads_playlist_id:
+        job_st.error("업로드 목록을 찾을 수 없습니다.")
+        return None
+
+    videos = youtube_utils.sync_uploaded_videos(job_st, uploads_playlist_id, full_refresh=full_refresh) or []
+    return {"channel_name": channel_info.get('snippet', {}).get('title', 'N/A'), "videos": videos}
+
+def apply_upload_list(upload_list):
+    st.session_state.time_analysis_videos = upload_list["videos"]
+    st.session_state.time_analysis_channel_name = upload_list["channel_name"]
+
 def render_time_analysis_page():
     st.title("⏰ 채널 업로드 시간 분석")
     st.markdown("채널의 모든 영상을 분석하여 업로드 시간 패턴을 시각화합니다.")
     
     with st.container(border=True):
         st.text_input("분석할 채널 URL:", key="time_analysis_url")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.checkbox("백그라운드에서 실행", key="time_analysis_in_background")
+        with col2:
+            st.checkbox("전체 목록 다시 동기화", key="time_analysis_full_refresh", help="기본적으로 이전에 저장한 목록 이후의 새 영상만 가져옵니다.")
 
         if st.button("🚀 업로드 시간 분석 시작", type="primary"):
             channel_url = st.session_state.time_analysis_url
             if not channel_url:
                 st.warning("채널 URL을 입력해주세요.")
                 return
+
+            if st.session_state.time_analysis_in_background:
+                job_id = job_utils.submit_background_job(
+                    UPLOAD_LIST_JOB_KIND, f"업로드 목록 수집: {channel_url}", _upload_list_job,
+                    job_utils.snapshot_session_state(st.session_state), channel_url,
+                    full_refresh=st.session_state.time_analysis_full_refresh
+                )
+                st.session_state.background_job_ids.append(job_id)
+                st.rerun()
             
             with st.spinner("채널 영상 목록 수집 중... (영상 수에 따라 시간이 걸릴 수 있습니다)"):
-                channel_id = youtube_utils.get_channel_id(st, channel_url)
-                if channel_id:
-                    channel_info = youtube_utils.get_channel_info(st, channel_id)
-                    uploads_playlist_id = channel_info.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
-                    
-                    if uploads_playlist_id:
-                        videos = youtube_utils.get_uploaded_videos_playlist(st, uploads_playlist_id)
-                        st.session_state.time_analysis_videos = videos
-                        st.session_state.time_analysis_channel_name = channel_info.get('snippet',{}).get('title','N/A')
-                        st.success(f"'{st.session_state.time_analysis_channel_name}' 채널의 영상 {len(videos)}개를 찾았습니다. 아래에 분석 결과가 표시됩니다.")
-                    else:
-                        st.error("업로드 목록을 찾을 수 없습니다.")
-                else:
-                    st.error("채널 ID를 찾을 수 없습니다.")
+                upload_list = _upload_list_job(st, channel_url, full_refresh=st.session_state.time_analysis_full_refresh)
+            if upload_list:
+                apply_upload_list(upload_list)
+                st.success(f"'{st.session_state.time_analysis_channel_name}' 채널의 영상 {len(upload_list['videos'])}개를 찾았습니다. 아래에 분석 결과가 표시됩니다.")
 
     if 'time_analysis_videos' in st.session_state:
         st.divider()
@@ -719,13 +1269,11 @@ def render_analysis_page():
     st.title("📊 데이터 분석")
     st.markdown("수집된 데이터의 일 평균 조회수를 분석하고, 그룹별로 관리합니다.")
     
-    if not st.session_state.get('analysis_data'):
+    data_version, df = video_store.load_versioned_dataframe(video_store.ANALYSIS_BUCKET) # '게시일'은 이미 datetime 타입입니다.
+    if df.empty:
         st.warning("'스크립트 & 댓글 수집' 탭에서 분석할 데이터를 먼저 옮겨주세요.")
         return
 
-    df = pd.DataFrame(st.session_state.analysis_data)
-    df['게시일'] = pd.to_datetime(df['게시일']) # 날짜 필터를 위해 먼저 변환
-
     # --- 분석 기간 설정 ---
     with st.container(border=True):
         st.subheader("🗓️ 분석 기간 설정")
@@ -738,18 +1286,16 @@ def render_analysis_page():
         with col2:
             end_date = st.date_input("종료일", value=max_date, min_value=min_date, max_value=max_date)
     
-    # 선택된 기간으로 데이터 필터링
-    start_datetime = pd.to_datetime(start_date)
-    end_datetime = pd.to_datetime(end_date) + pd.Timedelta(days=1)
-    df_filtered = df[(df['게시일'] >= start_datetime) & (df['게시일'] < end_datetime)]
+    # 선택된 기간의 지표를 한 번에 계산합니다. (데이터 버전/기간/그룹이 같으면 재사용)
+    metrics = metrics_utils.compute_view_metrics(df, data_version, start_date, end_date, st.session_state.custom_groups)
 
-    if df_filtered.empty:
+    if metrics["videos"].empty:
         st.warning("선택하신 기간에 해당하는 데이터가 없습니다.")
         return
 
     # --- 분석 데이터 관리 (삭제 기능 포함) ---
     with st.expander("🔬 분석 데이터 관리", expanded=False):
-        df_for_editing = pd.DataFrame(st.session_state.analysis_data)
+        df_for_editing = df.copy()
         
         select_all_delete_analysis = st.checkbox("전체 삭제", key="delete_all_analysis_data")
         df_for_editing.insert(0, "삭제", select_all_delete_analysis)
@@ -765,22 +1311,19 @@ def render_analysis_page():
             key="analysis_data_editor"
         )
 
-        indices_to_delete = edited_df[edited_df["삭제"] == True].index.tolist()
+        ids_to_delete = edited_df.index[edited_df["삭제"] == True].tolist()
 
-        if st.button("🗑️ 분석 데이터에서 선택 항목 삭제", type="primary", disabled=not indices_to_delete):
-            st.session_state.analysis_data = [
-                item for i, item in enumerate(st.session_state.analysis_data) if i not in indices_to_delete
-            ]
-            st.success(f"✅ {len(indices_to_delete)}개 항목을 분석 데이터에서 삭제했습니다.")
+        if st.button("🗑️ 분석 데이터에서 선택 항목 삭제", type="primary", disabled=not ids_to_delete):
+            video_store.delete_records(video_store.ANALYSIS_BUCKET, ids_to_delete)
+            st.success(f"✅ {len(ids_to_delete)}개 항목을 분석 데이터에서 삭제했습니다.")
             st.rerun()
 
     # 삭제 후 데이터가 남아있는지 다시 확인
-    if not st.session_state.get('analysis_data'):
+    if not video_store.count_records(video_store.ANALYSIS_BUCKET):
         st.info("모든 데이터가 삭제되었습니다. 새로운 데이터를 추가해주세요.")
         return
 
-    df = df_filtered # 필터링된 데이터로 분석 진행
-    all_channels_in_data = df['채널명'].unique()
+    all_channels_in_data = metrics["channel_summary"].index.tolist()
     
     # --- 그룹 관리 ---
     with st.expander("🔬 그룹 관리"):
@@ -837,115 +1380,64 @@ def render_analysis_page():
         horizontal=True
     )
 
-    # --- 일 평균 조회수 계산 (항상 맨 위에 실행) ---
-    try:
-        df['게시일'] = pd.to_datetime(df['게시일'])
-        now = pd.to_datetime(datetime.now())
-        df['게시 후 일수'] = (now - df['게시일']).dt.days
-        df['게시 후 일수'] = df['게시 후 일수'].apply(lambda x: max(x, 1))
-        df['일 평균 조회수'] = (df['조회수'] / df['게시 후 일수']).astype(int)
-        calculation_success = True
-    except Exception:
-        calculation_success = False
-        st.error("일 평균 조회수 계산 중 오류가 발생했습니다. 데이터에 '게시일' 또는 '조회수' 정보가 올바른지 확인해주세요.")
-
     # 채널별 분석
-    if calculation_success and st.session_state.analysis_view_mode == "채널별":
-        all_channels = df['채널명'].unique()
-        for channel in all_channels:
+    if st.session_state.analysis_view_mode == "채널별":
+        for channel, summary in metrics["channel_summary"].iterrows():
             with st.container(border=True):
                 st.markdown(f"#### {channel}")
-                channel_df = df[df['채널명'] == channel]
                 
                 col1, col2 = st.columns(2)
                 with col1:
                     # 일 평균 조회수 합계
-                    total_avg_daily_views = channel_df['일 평균 조회수'].sum()
-                    st.metric(label="채널의 일 평균 조회수 총합", value=f"{total_avg_daily_views:,}")
+                    st.metric(label="채널의 일 평균 조회수 총합", value=f"{int(summary['일 평균 조회수 총합']):,}")
                 with col2:
                     # 영상당 일 평균 조회수
-                    avg_daily_views = channel_df['일 평균 조회수'].mean()
-                    st.metric(label="채널의 영상당 일 평균 조회수", value=f"{int(avg_daily_views):,}")
+                    st.metric(label="채널의 영상당 일 평균 조회수", value=f"{int(summary['영상당 일 평균 조회수']):,}")
 
                 # 조회수 구간 분석
-                bins = [0, 1000, 100000, 500000, 1000000, float('inf')]
-                labels = ['0-1천', '1천-10만', '10만-50만', '50만-100만', '100만 이상']
-                
-                channel_df['조회수 구간'] = pd.cut(channel_df['조회수'], bins=bins, labels=labels, right=False)
-                view_dist = channel_df['조회수 구간'].value_counts().reindex(labels, fill_value=0)
-                
-                view_dist_df = view_dist.reset_index()
-                view_dist_df.columns = ['조회수 구간', '개수']
-                
-                total_videos = len(channel_df)
-                if total_videos > 0:
-                    view_dist_df['전체 비율'] = (view_dist_df['개수'] / total_videos * 100).apply(lambda x: f"{x:.2f}%")
-                else:
-                    view_dist_df['전체 비율'] = "0.00%"
-                
                 st.write("조회수 구간별 분포")
-                st.dataframe(view_dist_df, hide_index=True, use_container_width=True)
+                st.dataframe(metrics_utils.distribution_table(metrics["channel_distribution"].loc[channel]), hide_index=True, use_container_width=True)
 
             with st.expander("해당 채널의 영상 목록 보기"):
-                st.dataframe(channel_df[['제목', '조회수', '게시일', '일 평균 조회수']].sort_values(by='일 평균 조회수', ascending=False), use_container_width=True)
+                st.dataframe(metrics["channel_videos"][channel], use_container_width=True)
     
     # 그룹별 분석
-    elif calculation_success and st.session_state.analysis_view_mode == "그룹별":
+    elif st.session_state.analysis_view_mode == "그룹별":
         if not st.session_state.custom_groups:
             st.info("표시할 그룹이 없습니다. '그룹 관리'에서 새 그룹을 만들어주세요.")
         
-        for group_name, channels_in_group in st.session_state.custom_groups.items():
+        for group_name in st.session_state.custom_groups:
             with st.container(border=True):
                 st.markdown(f"####  그룹: {group_name}")
-                group_df = df[df['채널명'].isin(channels_in_group)]
-
-                if group_df.empty:
+                if group_name not in metrics["group_summary"].index:
                     st.write("이 그룹에 포함된 채널의 데이터가 없습니다.")
                     continue
+                summary = metrics["group_summary"].loc[group_name]
 
                 col1, col2 = st.columns(2)
                 with col1:
                     # 일 평균 조회수 합계
-                    total_avg_daily_views = group_df['일 평균 조회수'].sum()
-                    st.metric(label="그룹의 일 평균 조회수 총합", value=f"{total_avg_daily_views:,}")
+                    st.metric(label="그룹의 일 평균 조회수 총합", value=f"{int(summary['일 평균 조회수 총합']):,}")
                 with col2:
                     # 영상당 일 평균 조회수
-                    avg_daily_views = group_df['일 평균 조회수'].mean()
-                    st.metric(label="그룹의 영상당 일 평균 조회수", value=f"{int(avg_daily_views):,}")
+                    st.metric(label="그룹의 영상당 일 평균 조회수", value=f"{int(summary['영상당 일 평균 조회수']):,}")
 
                 # 조회수 구간 분석
-                bins = [0, 1000, 100000, 500000, 1000000, float('inf')]
-                labels = ['0-1천', '1천-10만', '10만-50만', '50만-100만', '100만 이상']
-                
-                group_df['조회수 구간'] = pd.cut(group_df['조회수'], bins=bins, labels=labels, right=False)
-                view_dist = group_df['조회수 구간'].value_counts().reindex(labels, fill_value=0)
-                
-                view_dist_df = view_dist.reset_index()
-                view_dist_df.columns = ['조회수 구간', '개수']
-                
-                total_videos = len(group_df)
-                if total_videos > 0:
-                    view_dist_df['전체 비율'] = (view_dist_df['개수'] / total_videos * 100).apply(lambda x: f"{x:.2f}%")
-                else:
-                    view_dist_df['전체 비율'] = "0.00%"
-
                 st.write("조회수 구간별 분포")
-                st.dataframe(view_dist_df, hide_index=True, use_container_width=True)
+                st.dataframe(metrics_utils.distribution_table(metrics["group_distribution"].loc[group_name]), hide_index=True, use_container_width=True)
 
             with st.expander("해당 그룹의 영상 목록 보기"):
-                st.dataframe(group_df[['채널명', '제목', '조회수', '게시일', '일 평균 조회수']].sort_values(by='일 평균 조회수', ascending=False), use_container_width=True)
+                st.dataframe(metrics["group_videos"][group_name], use_container_width=True)
 
     # --- 전체 통계 ---
-    if calculation_success:
-        st.divider()
-        st.subheader("📊 전체 데이터 요약")
-        total_avg_daily_views = df['일 평균 조회수'].sum()
-        st.metric(label="전체 채널의 일 평균 조회수 총합", value=f"{total_avg_daily_views:,}")
+    st.divider()
+    st.subheader("📊 전체 데이터 요약")
+    st.metric(label="전체 채널의 일 평균 조회수 총합", value=f"{metrics['total_daily_views']:,}")
 
-        # --- 원본 데이터 표시 ---
-        st.divider()
-        with st.expander("분석에 사용된 데이터 보기"):
-            st.dataframe(df[['채널명', '제목', '조회수', '게시일', '게시 후 일수', '일 평균 조회수']], use_container_width=True)
+    # --- 원본 데이터 표시 ---
+    st.divider()
+    with st.expander("분석에 사용된 데이터 보기"):
+        st.dataframe(metrics["videos"][['채널명', '제목', '조회수', '게시일', '게시 후 일수', '일 평균 조회수']], use_container_width=True)
 
 def main():
     st.set_page_config(page_title="YouTube 분석 도구", layout="wide")
@@ -960,7 +1452,7 @@ def main():
     
     # Automatically initialize clients if they haven't been, and keys are available.
     if not st.session_state.get('clients_initialized'):
-        if st.session_state.get('youtube_api_keys') and st.session_state.get('gemini_api_key'):
+        if st.session_state.get('youtube_api_keys') and gemini_utils.get_api_keys(st):
             youtube_utils.initialize_clients(st)
             if st.session_state.get('youtube_client'):
                 st.session_state.clients_initialized = True
@@ -971,6 +1463,9 @@ def main():
 
     st.sidebar.title("메뉴")
     st.sidebar.toggle("🌙 다크 모드", key="theme_is_dark")
+    if st.session_state.get('youtube_api_keys'):
+        remaining_units = sum(quota_utils.get_remaining_units(key) for key in st.session_state.youtube_api_keys)
+        st.sidebar.caption(f"YouTube 할당량 (추정): {remaining_units:,} 단위 남음")
     st.sidebar.divider()
     
     page_options = {
@@ -999,10 +1494,10 @@ def main():
         # Check for keys and initialization status to provide better guidance
         if not st.session_state.get('youtube_api_keys'):
              st.warning("YouTube API 키가 없습니다. '⚙️ 설정' 페이지에서 키를 추가해주세요.")
-        if not st.session_state.get('gemini_api_key'):
+        if not gemini_utils.get_api_keys(st):
              st.warning("Gemini API 키가 없습니다. '⚙️ 설정' 페이지에서 키를 입력해주세요.")
         
-        if st.session_state.get('youtube_api_keys') and st.session_state.get('gemini_api_key'):
+        if st.session_state.get('youtube_api_keys') and gemini_utils.get_api_keys(st):
              if not st.session_state.get('clients_initialized'):
                  st.error("API 클라이언트 초기화에 실패했습니다. '⚙️ 설정' 페이지에서 '저장 및 클라이언트 초기화' 버튼을 눌러주세요.")
 
@@ -1015,6 +1510,13 @@ def main():
         "채널 업로드 시간 분석": render_time_analysis_page,
         "설정": render_settings_page
     }
+    if st.session_state.background_job_ids:
+        # 가능하면 백그라운드 작업 패널만 주기적으로 다시 그립니다.
+        if hasattr(st, "fragment"):
+            st.fragment(run_every=BACKGROUND_POLL_SECONDS)(render_background_jobs)()
+        else:
+            render_background_jobs()
+
     page_map[st.session_state.page_selection]()
 
 if __name__ == "__main__":
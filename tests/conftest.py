@@ -0,0 +1,24 @@
+import os
+import sys
+import threading
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import storage_utils
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    """Points the SQLite store at a temporary directory so tests never touch .data/."""
+    monkeypatch.setattr(storage_utils, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage_utils, "DB_FILE", str(tmp_path / "test.sqlite3"))
+    monkeypatch.setattr(storage_utils, "_thread_local", threading.local())
+    monkeypatch.setattr(storage_utils, "_cache_stats", {})
+    # 각 모듈은 테이블 생성 여부를 기억하므로 새 DB 파일에 맞춰 초기화합니다.
+    for module in list(sys.modules.values()):
+        if hasattr(module, "_schema_ready") and os.path.dirname(getattr(module, "__file__", "") or "") == REPO_DIR:
+            monkeypatch.setattr(module, "_schema_ready", False)
+    return tmp_path
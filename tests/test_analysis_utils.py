@@ -0,0 +1,154 @@
+import pytest
+
+import analysis_utils
+import gemini_utils
+import job_utils
+import storage_utils
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        for start in range(0, len(self.text), 4):
+            yield _Chunk(self.text[start:start + 4])
+
+
+def _background_st():
+    job = {"messages": [], "output": None, "progress": ""}
+    session_state = {"gemini_api_key": "test-key"}
+    return job, job_utils.BackgroundStreamlit(job, session_state)
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    calls = []
+
+    def generate_content(st, prompt, system_instruction, model_name=None, stream=False, output=None):
+        calls.append(prompt)
+        return _Response(f"분석 결과: {prompt}")
+
+    monkeypatch.setattr(gemini_utils, "generate_content", generate_content)
+    return calls
+
+
+def test_cached_response_is_returned_in_background_job(fake_gemini):
+    job, st = _background_st()
+    first = analysis_utils.analyze_with_gemini(st, "같은 요청")
+    second = analysis_utils.analyze_with_gemini(st, "같은 요청")
+
+    assert first == second == "분석 결과: 같은 요청"
+    assert fake_gemini == ["같은 요청"]
+    assert job["output"] == first
+
+
+def test_streamed_analysis_completes_in_background_job(fake_gemini):
+    job, st = _background_st()
+    st.session_state.gemini_bypass_cache = True
+    result = analysis_utils.analyze_with_gemini(st, "스트리밍 요청")
+
+    assert result == "분석 결과: 스트리밍 요청"
+    assert job["output"] == result
+    assert not [message for level, message in job["messages"] if level == "error"]
+    assert any("첫 응답" in message for _, message in job["messages"])
+    assert analysis_utils._load_cached_response(
+        analysis_utils.response_cache_key(gemini_utils.DEFAULT_GEMINI_MODEL, analysis_utils.GEMINI_SYSTEM_INSTRUCTION, "스트리밍 요청")
+    ) == result
+
+
+@pytest.mark.parametrize("max_tokens", [1, 5, 50, 400])
+def test_split_into_chunks_respects_budget(max_tokens):
+    blocks = ["가" * length for length in (3, 9, 10, 11, 48, 50, 120, 7, 1, 333)]
+    text = "\n\n".join(blocks)
+    max_chars = max_tokens * analysis_utils.CHARS_PER_TOKEN
+
+    chunks = analysis_utils.split_into_chunks(text, max_tokens)
+
+    assert all(len(chunk) <= max_chars for chunk in chunks)
+    assert "".join(chunk.replace("\n\n", "") for chunk in chunks) == "".join(blocks)
+
+
+def test_split_into_chunks_keeps_videos_whole_when_they_fit():
+    text = "\n\n".join(["a" * 30, "b" * 30, "c" * 30])
+    assert analysis_utils.split_into_chunks(text, 40) == ["a" * 30 + "\n\n" + "b" * 30, "c" * 30]
+
+
+def test_channel_map_reduce_runs_in_background_job(fake_gemini, monkeypatch):
+    monkeypatch.setattr(analysis_utils, "run_concurrently", lambda st, func, items, max_workers: [func(item) for item in items])
+    job, st = _background_st()
+    scripts = "\n\n".join("대본 " * 5000 for _ in range(10))
+
+    result = analysis_utils.analyze_channel_scripts(st, "채널", scripts, "{channel_name}\n{all_scripts}")
+
+    assert result and result.startswith("분석 결과: 채널")
+    assert len(fake_gemini) > 1
+    assert any("묶음" in message for _, message in job["messages"])
+
+
+def test_comment_budget_keeps_comments_unchanged_when_they_fit():
+    storage_utils.save_comments("abcdefghijk", [
+        {"comment_id": "a", "text": "보통 댓글", "like_count": 5},
+        {"comment_id": "c", "text": "최고 댓글", "like_count": 500},
+    ])
+    numbered = "1.1 보통 댓글\n\n1.2 최고 댓글"
+
+    budgeted, _ = analysis_utils.budget_individual_fields({"comments": numbered}, video_id="abcdefghijk")
+
+    assert budgeted["comments"] == numbered
+
+
+def test_comment_budget_trims_by_likes_despite_numbering_and_keeps_order():
+    storage_utils.save_comments("abcdefghijk", [
+        {"comment_id": "a", "text": "보통 댓글", "like_count": 5},
+        {"comment_id": "b", "text": "인기 답글", "like_count": 50, "parent_id": "a"},
+        {"comment_id": "c", "text": "최고 댓글", "like_count": 500},
+    ])
+    numbered = "1.1 보통 댓글\n1.2 ↳ 인기 답글\n1.3 최고 댓글"
+    budget = analysis_utils.estimate_tokens("↳ 인기 답글") + analysis_utils.estimate_tokens("최고 댓글")
+
+    budgeted, _ = analysis_utils.budget_individual_fields({"comments": numbered}, video_id="abcdefghijk", budgets={"comments": budget})
+
+    assert budgeted["comments"].splitlines() == ["↳ 인기 답글", "최고 댓글"]
+
+
+def test_comment_budget_without_stored_comments_keeps_the_first_lines():
+    comments = "첫째\n\n둘째\n셋째"
+    budget = analysis_utils.estimate_tokens("첫째") + analysis_utils.estimate_tokens("둘째")
+
+    budgeted, _ = analysis_utils.budget_individual_fields({"comments": comments}, video_id="abcdefghijk", budgets={"comments": budget})
+
+    assert budgeted["comments"] == "첫째\n둘째"
+
+
+def test_channel_analysis_holds_gemini_slot_per_request(monkeypatch):
+    import threading
+    import time
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def generate_content(st, prompt, system_instruction, model_name=None, stream=False, output=None):
+        with lock:
+            active.append(prompt)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(prompt)
+        return _Response("요약")
+
+    monkeypatch.setattr(gemini_utils, "generate_content", generate_content)
+    _, st = _background_st()
+    scripts = "\n\n".join("대본 " * 5000 for _ in range(10))
+
+    result = analysis_utils.analyze_channel_scripts(st, "채널", scripts, "{channel_name}\n{all_scripts}", gemini_slots=threading.Semaphore(2))
+
+    assert result == "요약"
+    assert len(peak) > 2
+    assert max(peak) <= 2
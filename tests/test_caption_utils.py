@@ -0,0 +1,47 @@
+import caption_utils
+
+MANUAL_VTT = """WEBVTT
+
+1
+00:00:01.000 --> 00:00:02.000
+I said no
+
+2
+00:00:02.000 --> 00:00:03.000
+no means no
+"""
+
+ROLLING_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+I<00:00:00.500><c> said</c><00:00:01.000><c> no</c>
+
+00:00:02.000 --> 00:00:04.000 align:start position:0%
+I said no
+no<00:00:02.500><c> means</c><00:00:03.000><c> no</c>
+"""
+
+
+def test_manual_subtitles_keep_words_that_repeat_the_previous_line():
+    assert caption_utils.clean_vtt(MANUAL_VTT) == "I said no\nno means no"
+
+
+def test_rolling_auto_captions_drop_repeated_prefix():
+    assert caption_utils.clean_vtt(ROLLING_VTT) == "I said no\nmeans no"
+
+
+def test_explicit_rolling_flag_overrides_detection():
+    assert caption_utils.clean_vtt(MANUAL_VTT, rolling=True) == "I said no\nmeans no"
+    assert caption_utils.clean_vtt(ROLLING_VTT, rolling=False) == "I said no\nno means no"
+
+
+def test_lines_that_become_blank_after_cleanup_are_skipped():
+    vtt = "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\n&nbsp;\n\n00:00:02.000 --> 00:00:03.000\n<c>&nbsp;</c>\n안녕하세요\n"
+    assert caption_utils.clean_vtt(vtt) == "안녕하세요"
+
+
+def test_manual_srv3_keeps_words():
+    srv3 = "<timedtext><body><p t=\"0\">I said no</p><p t=\"1000\">no means no</p></body></timedtext>"
+    assert caption_utils.clean_srv3(srv3) == "I said no\nno means no"
@@ -0,0 +1,37 @@
+import types
+
+import pytest
+
+import gemini_utils
+
+
+class _Model:
+    def __init__(self, model_name=None, system_instruction=None):
+        self.model_name = model_name
+        self._client = None
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    configured = []
+    monkeypatch.setattr(gemini_utils, "_models", {})
+    monkeypatch.setattr(gemini_utils.genai, "configure", lambda api_key=None, **kwargs: configured.append(api_key))
+    monkeypatch.setattr(gemini_utils.genai, "GenerativeModel", _Model)
+    monkeypatch.setattr(gemini_utils.genai_client, "get_default_generative_client", lambda: f"client-for-{configured[-1]}")
+    return configured
+
+
+def test_models_are_cached_per_key_and_pinned_to_their_client(fake_genai):
+    first = gemini_utils.get_model("key-a", "model", "system")
+
+    assert gemini_utils.get_model("key-a", "model", "system") is first
+    second = gemini_utils.get_model("key-b", "model", "system")
+    assert first._client == "client-for-key-a"
+    assert second._client == "client-for-key-b"
+    assert fake_genai == ["key-a", "key-b"]
+
+
+def test_model_without_private_client_is_rejected(fake_genai, monkeypatch):
+    monkeypatch.setattr(gemini_utils.genai, "GenerativeModel", lambda **kwargs: types.SimpleNamespace())
+    with pytest.raises(RuntimeError):
+        gemini_utils.get_model("key-a", "model", "system")
@@ -0,0 +1,57 @@
+import time
+
+import job_utils
+
+
+def test_scan_reports_are_stored_in_the_job_record():
+    job_id = job_utils.create_job("collection", {"urls": []})
+    assert job_utils.get_job(job_id)["scan_reports"] == []
+
+    reports = [{"channel_id": "UC1", "pages_scanned": 3, "quota_units": 6}]
+    job_utils.save_job_scan_reports(job_id, reports)
+
+    assert job_utils.get_job(job_id)["scan_reports"] == reports
+    assert job_utils.list_jobs("collection")[0]["scan_reports"] == reports
+
+
+def _expire_lease(job_id):
+    conn = job_utils._get_connection()
+    conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (time.time() - job_utils.JOB_LEASE_SECONDS - 1, job_id))
+    conn.commit()
+
+
+def test_a_job_with_a_live_lease_cannot_be_claimed_or_deleted():
+    job_id = job_utils.create_job("collection", {"urls": []})
+
+    assert job_utils.is_job_live(job_utils.get_job(job_id))
+    assert not job_utils.claim_job(job_id)
+    assert not job_utils.delete_job(job_id)
+    assert job_utils.get_job(job_id) is not None
+
+
+def test_an_interrupted_job_is_claimed_once_and_can_be_deleted():
+    job_id = job_utils.create_job("collection", {"urls": []})
+    job_utils.save_job_item(job_id, "vid1", {"id": "vid1"})
+    _expire_lease(job_id)
+
+    assert not job_utils.is_job_live(job_utils.get_job(job_id))
+    assert job_utils.claim_job(job_id)
+    assert not job_utils.claim_job(job_id)  # 두 번째 세션은 점유할 수 없습니다.
+
+    _expire_lease(job_id)
+    assert job_utils.delete_job(job_id)
+    assert job_utils.get_job(job_id) is None
+    assert job_utils.load_job_items(job_id) == {}
+
+
+def test_heartbeat_keeps_the_lease_alive(monkeypatch):
+    monkeypatch.setattr(job_utils, "JOB_HEARTBEAT_SECONDS", 0.01)
+    job_id = job_utils.create_job("collection", {"urls": []})
+    _expire_lease(job_id)
+
+    stop = job_utils.start_heartbeat(job_id)
+    try:
+        time.sleep(0.05)
+        assert job_utils.is_job_live(job_utils.get_job(job_id))
+    finally:
+        stop.set()
@@ -0,0 +1,54 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import quota_utils
+
+PACIFIC = timezone(timedelta(hours=-8))
+
+
+def _set_pacific_now(monkeypatch, moment):
+    monkeypatch.setattr(quota_utils, "_pacific_now", lambda: moment)
+
+
+def test_usage_rolls_over_at_pacific_midnight(monkeypatch):
+    _set_pacific_now(monkeypatch, datetime(2024, 3, 1, 23, 30, tzinfo=PACIFIC))
+    quota_utils.record_usage("key-a", 100)
+    quota_utils.record_usage("key-a", 50)
+    assert quota_utils.get_used_units("key-a") == 150
+    assert quota_utils.get_remaining_units("key-a") == quota_utils.DAILY_QUOTA_UNITS - 150
+    assert quota_utils.next_reset_timestamp() == datetime(2024, 3, 2, 0, 0, tzinfo=PACIFIC).timestamp()
+
+    _set_pacific_now(monkeypatch, datetime(2024, 3, 2, 0, 5, tzinfo=PACIFIC))
+    assert quota_utils.get_used_units("key-a") == 0
+    assert quota_utils.get_remaining_units("key-a") == quota_utils.DAILY_QUOTA_UNITS
+
+
+def test_parked_key_is_skipped_until_it_expires():
+    quota_utils.park_key("key-a", until=time.time() + 60)
+    assert quota_utils.get_parked_until("key-a") is not None
+    assert quota_utils.get_remaining_units("key-a") == 0
+
+    quota_utils.park_key("key-a", until=time.time() - 1)
+    assert quota_utils.get_parked_until("key-a") is None
+
+
+def test_pick_key_index_keeps_current_key_while_it_has_headroom():
+    quota_utils.record_usage("key-a", 5000)
+    assert quota_utils.pick_key_index(["key-a", "key-b"], current_index=0) == 0
+
+
+def test_pick_key_index_switches_to_the_key_with_most_headroom():
+    keys = ["key-a", "key-b", "key-c"]
+    quota_utils.record_usage("key-a", quota_utils.DAILY_QUOTA_UNITS - quota_utils.LOW_QUOTA_THRESHOLD + 1)
+    quota_utils.record_usage("key-b", 3000)
+    quota_utils.record_usage("key-c", 1000)
+    assert quota_utils.pick_key_index(keys, current_index=0) == 2
+
+    quota_utils.park_key("key-c")
+    assert quota_utils.pick_key_index(keys, current_index=0) == 1
+
+
+def test_pick_key_index_returns_none_when_every_key_is_parked():
+    quota_utils.park_key("key-a")
+    quota_utils.park_key("key-b")
+    assert quota_utils.pick_key_index(["key-a", "key-b"], current_index=0) is None
@@ -0,0 +1,74 @@
+import sqlite3
+
+import storage_utils
+import video_store
+
+
+def _record(video_id, title="제목"):
+    return {"채널명": "채널", "제목": title, "영상 URL": f"https://youtu.be/{video_id}", "조회수": 10, "게시일": "2024-01-01 00:00:00", "자막": "자막", "댓글": ["댓글"], "설명": "설명"}
+
+
+def _other_process(sql, *args):
+    """Writes through a separate SQLite connection, bypassing this process's module state like another replica would."""
+    video_store.count_records(video_store.CHANNEL_BUCKET)  # 스키마 생성
+    conn = sqlite3.connect(storage_utils.DB_FILE)
+    conn.execute(sql, args)
+    conn.commit()
+    conn.close()
+
+
+def test_lookups_see_writes_from_other_processes():
+    bucket = video_store.CHANNEL_BUCKET
+    assert video_store.collected_video_ids() == frozenset()
+
+    _other_process(
+        "INSERT INTO videos (bucket, video_id, position, url, added_at) VALUES (?, ?, 0, ?, 0)",
+        bucket, "abcdefghijk", "https://www.youtube.com/watch?v=abcdefghijk"
+    )
+    assert video_store.count_records(bucket) == 1
+    assert video_store.collected_video_ids() == {"abcdefghijk"}
+    assert video_store.add_records(bucket, [_record("abcdefghijk")]) == []
+
+    _other_process("DELETE FROM videos WHERE bucket = ?", bucket)
+    assert video_store.collected_video_ids() == frozenset()
+    assert len(video_store.add_records(bucket, [_record("abcdefghijk")])) == 1
+
+
+def test_add_records_skips_duplicates_within_and_across_calls():
+    bucket = video_store.INDIVIDUAL_BUCKET
+    video_store.add_records(bucket, [_record("abcdefghijk")])
+    added = video_store.add_records(bucket, [_record("abcdefghijk", "다시"), _record("bcdefghijkl"), _record("bcdefghijkl")])
+
+    assert [record["영상 URL"] for record in added] == ["https://youtu.be/bcdefghijkl"]
+    assert [record["제목"] for record in video_store.load_records(bucket)] == ["제목", "제목"]
+
+
+def test_load_records_chunks_large_id_filters_and_keeps_insertion_order(monkeypatch):
+    monkeypatch.setattr(video_store, "SQL_VARIABLE_CHUNK", 2)
+    bucket = video_store.ANALYSIS_BUCKET
+    video_ids = [f"video{i:06d}" for i in range(5)]
+    video_store.add_records(bucket, [_record(video_id, video_id) for video_id in video_ids])
+
+    records = video_store.load_records(bucket, video_ids=list(reversed(video_ids)) + ["missing0000"])
+
+    assert [record["제목"] for record in records] == video_ids
+    assert records[0]["자막"] == "자막"
+    assert video_store.load_records(bucket, video_ids=[]) == []
+
+
+def test_versioned_dataframe_matches_its_version():
+    bucket = video_store.ANALYSIS_BUCKET
+    video_store.add_records(bucket, [_record("abcdefghijk")])
+    version, df = video_store.load_versioned_dataframe(bucket)
+    assert version == video_store.get_version(bucket)
+    assert list(df.index) == ["abcdefghijk"]
+
+    _other_process(
+        "INSERT INTO videos (bucket, video_id, position, url, views, added_at) VALUES (?, ?, 1, ?, 0, 0)",
+        bucket, "bcdefghijkl", "https://www.youtube.com/watch?v=bcdefghijkl"
+    )
+    _other_process("UPDATE video_buckets SET version = version + 1 WHERE bucket = ?", bucket)
+    new_version, new_df = video_store.load_versioned_dataframe(bucket)
+    assert new_version != version
+    assert list(new_df.index) == ["abcdefghijk", "bcdefghijkl"]
+    assert video_store.load_dataframe(bucket) is new_df
@@ -0,0 +1,206 @@
+import contextlib
+import types
+
+import pytest
+
+import job_utils
+import storage_utils
+import youtube_utils
+
+
+def _fake_comments(count):
+    for index in range(count):
+        yield {
+            "comment_id": f"c{index}",
+            "parent_id": "c0" if index % 10 == 9 else None,
+            "author": "작성자",
+            "text": f"댓글 {index}",
+            "like_count": index,
+            "published_at": None,
+        }
+
+
+def test_get_top_comments_streams_into_store_and_returns_iterator(monkeypatch):
+    monkeypatch.setattr(youtube_utils, "iter_comments", lambda st, video_id, max_results, include_replies=False: _fake_comments(max_results))
+    st = types.SimpleNamespace(warning=print)
+
+    comments = youtube_utils.get_top_comments(st, "abcdefghijk", 1234)
+
+    assert not isinstance(comments, (list, str))
+    assert storage_utils.count_comments("abcdefghijk") == 1234
+    lines = youtube_utils.comment_lines(comments)
+    assert len(lines) == youtube_utils.COMMENTS_TEXT_LIMIT
+    assert lines[0] == "댓글 0" and lines[9] == "↳ 댓글 9"
+
+
+def test_get_top_comments_without_comments_clears_stale_ones(monkeypatch):
+    storage_utils.save_comments("abcdefghijk", list(_fake_comments(3)))
+    monkeypatch.setattr(youtube_utils, "iter_comments", lambda st, video_id, max_results, include_replies=False: iter(()))
+
+    assert youtube_utils.get_top_comments(types.SimpleNamespace(), "abcdefghijk", 100) == "댓글 없음"
+    assert storage_utils.count_comments("abcdefghijk") == 0
+
+
+class _Request:
+    def __init__(self, response):
+        self._response = response
+
+    def execute(self):
+        return self._response
+
+
+class _FakeYouTube:
+    def __init__(self, video_ids):
+        self._video_ids = video_ids
+
+    def playlistItems(self):
+        return self
+
+    def videos(self):
+        return self
+
+    def list(self, **kwargs):
+        if "playlistId" in kwargs:
+            return _Request({"items": [
+                {"snippet": {"resourceId": {"kind": "youtube#video", "videoId": video_id}, "publishedAt": "2024-01-01T00:00:00Z"}}
+                for video_id in self._video_ids
+            ]})
+        return _Request({"items": [
+            {"id": video_id, "snippet": {"title": video_id}, "statistics": {"viewCount": "100"}}
+            for video_id in kwargs["id"].split(",")
+        ]})
+
+
+def test_get_latest_videos_returns_scan_report_without_session_state(monkeypatch):
+    monkeypatch.setattr(youtube_utils, "get_cached_channel_info", lambda channel_id, include_statistics=True: {
+        "snippet": {"title": "채널"}, "contentDetails": {"relatedPlaylists": {"uploads": "UU1"}}
+    })
+    st = types.SimpleNamespace(session_state=types.SimpleNamespace(youtube_client=_FakeYouTube(["abcdefghijk", "bcdefghijkl"])))
+    reports = []
+
+    videos = youtube_utils.get_latest_videos.__wrapped__(st, "UC1", 2, 0, scan_reports=reports)
+
+    assert [video["videoId"] for video in videos] == ["abcdefghijk", "bcdefghijkl"]
+    assert reports == [{
+        "channel_id": "UC1", "channel_title": "채널", "pages_scanned": 1, "videos_checked": 2,
+        "quota_units": 2, "found": 2, "stop_reason": "목표 개수 달성",
+    }]
+    assert not hasattr(st.session_state, "channel_scan_reports")
+
+
+def test_smaller_fetch_reads_from_store_instead_of_replacing_it(monkeypatch):
+    storage_utils.save_comments("abcdefghijk", list(_fake_comments(1000)))
+    monkeypatch.setattr(youtube_utils, "iter_comments", lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("API를 호출하면 안 됩니다")))
+
+    comments = list(youtube_utils.get_top_comments(types.SimpleNamespace(), "abcdefghijk", 20))
+
+    assert len(comments) == 20
+    assert storage_utils.count_comments("abcdefghijk") == 1000
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=abcdefghijk",
+    "https://www.youtube.com/watch?feature=share&v=abcdefghijk&t=30s",
+    "https://m.youtube.com/watch?v=abcdefghijk",
+    "https://youtu.be/abcdefghijk",
+    "https://youtu.be/abcdefghijk?si=share",
+    "https://www.youtube.com/shorts/abcdefghijk",
+    "https://youtube.com/shorts/abcdefghijk/",
+    "www.youtube.com/watch?v=abcdefghijk",
+    "youtu.be/abcdefghijk",
+    "  https://www.youtube.com/live/abcdefghijk  ",
+])
+def test_get_video_id_normalizes_url_variants(url):
+    assert youtube_utils.get_video_id(url) == "abcdefghijk"
+    assert youtube_utils.normalize_video_url(url) == "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+@pytest.mark.parametrize("url", [
+    "",
+    None,
+    "https://www.youtube.com/@channel",
+    "https://www.youtube.com/channel/UCabcdefghijklmnopqrstuv",
+    "https://example.com/watch?v=abcdefghijk",
+    "https://youtu.be/short",
+])
+def test_get_video_id_rejects_non_video_urls(url):
+    assert youtube_utils.get_video_id(url) is None
+
+
+class _FakePagedPlaylist:
+    """Uploads playlist served newest first, 'page_size' items per page; records the page tokens requested."""
+    def __init__(self, video_ids, page_size=2):
+        self.video_ids = video_ids
+        self.page_size = page_size
+        self.requested_pages = []
+
+    def playlistItems(self):
+        return self
+
+    def list(self, pageToken=None, **kwargs):
+        start = int(pageToken or 0)
+        self.requested_pages.append(start)
+        page = self.video_ids[start:start + self.page_size]
+        response = {"items": [
+            {"snippet": {"resourceId": {"videoId": video_id}, "publishedAt": f"2024-01-{video_id[1:]:0>2}T00:00:00Z"}}
+            for video_id in page
+        ]}
+        if start + self.page_size < len(self.video_ids):
+            response["nextPageToken"] = str(start + self.page_size)
+        return _Request(response)
+
+
+def _playlist_video_ids(items):
+    return [item["snippet"]["resourceId"]["videoId"] for item in items]
+
+
+def test_sync_uploaded_videos_stops_at_the_first_known_video():
+    playlist = _FakePagedPlaylist(["v4", "v3", "v2", "v1"])
+    st = types.SimpleNamespace(session_state=types.SimpleNamespace(youtube_client=playlist))
+    assert _playlist_video_ids(youtube_utils.sync_uploaded_videos.__wrapped__(st, "UU1")) == ["v4", "v3", "v2", "v1"]
+    assert playlist.requested_pages == [0, 2]
+
+    playlist.video_ids = ["v6", "v5", "v4", "v3", "v2", "v1"]
+    playlist.requested_pages = []
+    items = youtube_utils.sync_uploaded_videos.__wrapped__(st, "UU1")
+
+    assert _playlist_video_ids(items) == ["v6", "v5", "v4", "v3", "v2", "v1"]
+    assert playlist.requested_pages == [0, 2]  # 'v4'를 만난 두 번째 페이지에서 멈추고 나머지는 요청하지 않습니다.
+
+
+class _QuietSt:
+    """Minimal streamlit stand-in for process_urls: spinners and messages are no-ops."""
+    def __init__(self):
+        self.session_state = types.SimpleNamespace()
+        self.messages = []
+
+    @contextlib.contextmanager
+    def spinner(self, text):
+        yield
+
+    def info(self, message):
+        self.messages.append(message)
+
+    warning = info
+
+
+def test_process_urls_resumes_from_checkpointed_items(monkeypatch):
+    job_id = job_utils.create_job("collection", {"urls": []})
+    job_utils.save_job_plan(job_id, ["abcdefghijk", "bcdefghijkl", "cdefghijklm"])
+    job_utils.save_job_item(job_id, "abcdefghijk", {"영상 URL": "a", "자막": "자막 a", "댓글": ["댓글 a"]})
+
+    fetched = []
+    def fake_details(st, video_id, comment_count, join_comments=True, metadata=None, include_replies=False):
+        fetched.append(video_id)
+        return {"영상 URL": video_id, "자막": f"자막 {video_id}", "댓글": [f"댓글 {video_id}"]}
+
+    monkeypatch.setattr(youtube_utils, "_plan_video_ids", lambda *args: (_ for _ in ()).throw(AssertionError("저장된 계획을 사용해야 합니다")))
+    monkeypatch.setattr(youtube_utils, "get_videos_metadata", lambda st, video_ids: {video_id: {} for video_id in video_ids})
+    monkeypatch.setattr(youtube_utils, "get_video_details", fake_details)
+    monkeypatch.setattr(youtube_utils, "run_concurrently", lambda st, func, items, max_workers: [func(item) for item in items])
+
+    results = youtube_utils.process_urls(_QuietSt(), [], 10, 0, 5, True, False, job_id=job_id)
+
+    assert fetched == ["bcdefghijkl", "cdefghijklm"]
+    assert [record["자막"] for record in results] == ["1. 자막 a", "2. 자막 bcdefghijkl", "3. 자막 cdefghijklm"]
+    assert set(job_utils.load_job_items(job_id)) == {"abcdefghijk", "bcdefghijkl", "cdefghijklm"}
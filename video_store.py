@@ -0,0 +1,307 @@
+import time
+import hashlib
+import threading
+
+import pandas as pd
+
+import storage_utils
+import youtube_utils
+
+# 데이터 묶음(bucket) 이름은 기존 session_state 키와 같게 유지합니다.
+# 세션별 목록이었던 예전과 달리, 저장소는 프로세스와 모든 세션이 함께 쓰는 하나의 SQLite 파일입니다.
+# 따라서 한 세션에서 삭제/수정하면 다른 세션에도 바로 반영됩니다.
+CHANNEL_BUCKET = 'collected_channel_data'
+INDIVIDUAL_BUCKET = 'collected_individual_data'
+ANALYSIS_BUCKET = 'analysis_data'
+COLLECTED_BUCKETS = (CHANNEL_BUCKET, INDIVIDUAL_BUCKET)
+
+# 레코드 키(화면 표시 이름) -> videos 테이블 컬럼
+RECORD_COLUMNS = (
+    ("채널명", "channel"),
+    ("제목", "title"),
+    ("영상 URL", "url"),
+    ("조회수", "views"),
+    ("게시일", "published_at"),
+    ("자막", "transcript"),
+    ("댓글", "comments"),
+    ("설명", "description"),
+)
+
+# 자막/댓글 원문은 blobs 테이블에 따로 두고, 표에는 미리보기와 길이만 둡니다.
+TEXT_COLUMNS = (
+    ("자막", "transcript"),
+    ("댓글", "comments"),
+)
+PREVIEW_CHARS = 80
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+_frame_lock = threading.Lock()
+_frame_cache = {}  # bucket -> (version, DataFrame)
+SQL_VARIABLE_CHUNK = 500  # SQLite 바인딩 변수 개수 제한
+
+def _get_connection():
+    """Returns the shared SQLite connection, creating the video tables on first use."""
+    global _schema_ready
+    conn = storage_utils.get_connection()
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    bucket TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    channel TEXT,
+                    title TEXT,
+                    url TEXT NOT NULL,
+                    views INTEGER NOT NULL DEFAULT 0,
+                    published_at TEXT,
+                    transcript_ref TEXT,
+                    transcript_preview TEXT,
+                    transcript_len INTEGER NOT NULL DEFAULT 0,
+                    comments_ref TEXT,
+                    comments_preview TEXT,
+                    comments_len INTEGER NOT NULL DEFAULT 0,
+                    description TEXT,
+                    added_at REAL NOT NULL,
+                    PRIMARY KEY (bucket, video_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    text TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_bucket_position ON videos (bucket, position)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_buckets (
+                    bucket TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            """)
+            conn.commit()
+            _schema_ready = True
+    return conn
+
+# --- Blob Store ---
+def _put_blob(conn, text):
+    """Stores text under its SHA-256 and returns the hash; identical texts are stored once."""
+    blob_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    conn.execute("INSERT OR IGNORE INTO blobs (hash, text) VALUES (?, ?)", (blob_hash, text))
+    return blob_hash
+
+def _text_fields(conn, text):
+    """(ref, preview, length) for a long text field."""
+    if text is None:
+        return None, None, 0
+    preview = text[:PREVIEW_CHARS].replace("\n", " ")
+    if len(text) > PREVIEW_CHARS:
+        preview += "…"
+    return _put_blob(conn, text), preview, len(text)
+
+def get_blobs(blob_hashes):
+    """Returns {hash: text} for the given hashes."""
+    blob_hashes = [blob_hash for blob_hash in set(blob_hashes) if blob_hash]
+    texts = {}
+    conn = _get_connection()
+    for start in range(0, len(blob_hashes), SQL_VARIABLE_CHUNK):
+        chunk = blob_hashes[start:start + SQL_VARIABLE_CHUNK]
+        rows = conn.execute(f"SELECT hash, text FROM blobs WHERE hash IN ({', '.join('?' * len(chunk))})", chunk)
+        texts.update(rows)
+    return texts
+
+def _prune_blobs(conn):
+    """Deletes blobs no video row refers to any more."""
+    conn.execute("""
+        DELETE FROM blobs WHERE hash NOT IN (
+            SELECT transcript_ref FROM videos WHERE transcript_ref IS NOT NULL
+            UNION SELECT comments_ref FROM videos WHERE comments_ref IS NOT NULL
+        )
+    """)
+
+def _bump_version(conn, bucket):
+    conn.execute(
+        "INSERT INTO video_buckets (bucket, version) VALUES (?, 1) "
+        "ON CONFLICT(bucket) DO UPDATE SET version = version + 1",
+        (bucket,)
+    )
+
+def get_version(bucket):
+    """Data version of a bucket; it changes on every insert or delete."""
+    row = _get_connection().execute("SELECT version FROM video_buckets WHERE bucket = ?", (bucket,)).fetchone()
+    return row[0] if row else 0
+
+def _stored_columns(with_text):
+    """SELECT list matching RECORD_COLUMNS; text columns become their blob refs or previews."""
+    text_columns = dict(TEXT_COLUMNS)
+    suffix = "_ref" if with_text else "_preview"
+    return [f"{column}{suffix}" if label in text_columns else column for label, column in RECORD_COLUMNS]
+
+# --- Video-ID Lookups ---
+# 여러 프로세스(Streamlit 복제본 포함)가 같은 DB를 쓰므로 메모리 인덱스 대신
+# (bucket, video_id) 기본 키 인덱스로 매번 조회합니다.
+def _existing_ids(conn, buckets, video_ids):
+    """Subset of video_ids present in any of the buckets, via the primary-key index."""
+    video_ids = list(video_ids)
+    bucket_marks = ', '.join('?' * len(buckets))
+    found = set()
+    for start in range(0, len(video_ids), SQL_VARIABLE_CHUNK):
+        chunk = video_ids[start:start + SQL_VARIABLE_CHUNK]
+        rows = conn.execute(
+            f"SELECT video_id FROM videos WHERE bucket IN ({bucket_marks}) AND video_id IN ({', '.join('?' * len(chunk))})",
+            (*buckets, *chunk)
+        )
+        found.update(row[0] for row in rows)
+    return found
+
+def collected_video_ids():
+    """Video IDs in any collection bucket, for dedup before collecting."""
+    rows = _get_connection().execute(
+        f"SELECT DISTINCT video_id FROM videos WHERE bucket IN ({', '.join('?' * len(COLLECTED_BUCKETS))})", COLLECTED_BUCKETS
+    )
+    return frozenset(row[0] for row in rows)
+
+# --- Writes ---
+def add_records(bucket, records):
+    """Appends collected video records (dicts keyed by display name); videos already in the bucket are skipped.
+    Returns the records that were actually added."""
+    records = [(youtube_utils.get_video_id(record.get("영상 URL", "")), record) for record in records]
+    records = [(video_id, record) for video_id, record in records if video_id]
+    if not records:
+        return []
+
+    conn = _get_connection()
+    # 중복 확인부터 삽입까지 한 쓰기 트랜잭션으로 묶어 다른 프로세스와 겹쳐도 같은 영상이 두 번 들어가지 않게 합니다.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        seen_ids = _existing_ids(conn, (bucket,), {video_id for video_id, _ in records})
+        position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM videos WHERE bucket = ?", (bucket,)).fetchone()[0]
+        now = time.time()
+
+        added = []
+        rows = []
+        for video_id, record in records:
+            if video_id in seen_ids:
+                continue
+            seen_ids.add(video_id)
+            comments = record.get("댓글")
+            if isinstance(comments, list):
+                comments = "\n".join(comments)
+            rows.append((
+                bucket, video_id, position,
+                record.get("채널명"), record.get("제목"), youtube_utils.normalize_video_url(record["영상 URL"]), int(record.get("조회수") or 0), record.get("게시일"),
+                *_text_fields(conn, record.get("자막")), *_text_fields(conn, comments), record.get("설명"), now,
+            ))
+            position += 1
+            added.append(record)
+
+        if rows:
+            conn.executemany(
+                "INSERT INTO videos (bucket, video_id, position, channel, title, url, views, published_at, "
+                "transcript_ref, transcript_preview, transcript_len, comments_ref, comments_preview, comments_len, description, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            _bump_version(conn, bucket)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return added
+
+def copy_records(source_bucket, target_bucket, video_ids):
+    """Copies videos between buckets (e.g. collected -> analysis). Returns the number of videos added."""
+    return len(add_records(target_bucket, load_records(source_bucket, video_ids=video_ids)))
+
+def delete_records(bucket, video_ids):
+    conn = _get_connection()
+    conn.executemany("DELETE FROM videos WHERE bucket = ? AND video_id = ?", [(bucket, video_id) for video_id in video_ids])
+    _prune_blobs(conn)
+    _bump_version(conn, bucket)
+    conn.commit()
+
+def clear_bucket(bucket):
+    """Deletes every video in the bucket for all sessions; callers should confirm with the user first."""
+    conn = _get_connection()
+    conn.execute("DELETE FROM videos WHERE bucket = ?", (bucket,))
+    _prune_blobs(conn)
+    _bump_version(conn, bucket)
+    conn.commit()
+
+# --- Reads ---
+def count_records(bucket):
+    return _get_connection().execute("SELECT COUNT(*) FROM videos WHERE bucket = ?", (bucket,)).fetchone()[0]
+
+def load_records(bucket, video_ids=None, channel=None, with_text=True):
+    """
+    Returns records in insertion order, optionally filtered. Transcripts and comments are loaded from
+    the blob store only here, for the selected rows; with_text=False returns their previews instead.
+    """
+    query = f"SELECT position, {', '.join(_stored_columns(with_text))} FROM videos WHERE bucket = ?"
+    args = [bucket]
+    if channel is not None:
+        query += " AND channel = ?"
+        args.append(channel)
+
+    conn = _get_connection()
+    if video_ids is None:
+        rows = conn.execute(query + " ORDER BY position", args).fetchall()
+    else:
+        # SQLite 변수 개수 제한을 넘지 않도록 ID를 나눠 조회한 뒤 저장 순서대로 합칩니다.
+        video_ids = list(dict.fromkeys(video_ids))
+        rows = []
+        for start in range(0, len(video_ids), SQL_VARIABLE_CHUNK):
+            chunk = video_ids[start:start + SQL_VARIABLE_CHUNK]
+            rows.extend(conn.execute(query + f" AND video_id IN ({', '.join('?' * len(chunk))})", (*args, *chunk)))
+        rows.sort(key=lambda row: row[0])
+
+    records = [{label: value for (label, _), value in zip(RECORD_COLUMNS, row[1:])} for row in rows]
+    if with_text:
+        texts = get_blobs(record[label] for record in records for label, _ in TEXT_COLUMNS)
+        for record in records:
+            for label, _ in TEXT_COLUMNS:
+                record[label] = texts.get(record[label]) if record[label] else None
+    return records
+
+def load_dataframe(bucket):
+    """
+    Returns the bucket as a typed DataFrame indexed by video ID, with display-name columns.
+    Transcripts and comments appear only as previews plus '자막 길이'/'댓글 길이' (characters);
+    use load_records for the full text. The frame is rebuilt only when the bucket's data version
+    changes, so callers must treat it as read-only.
+    """
+    return load_versioned_dataframe(bucket)[1]
+
+def load_versioned_dataframe(bucket):
+    """Returns (data version, DataFrame) read from the same snapshot, for caches keyed on the version."""
+    version = get_version(bucket)
+    with _frame_lock:
+        cached = _frame_cache.get(bucket)
+        if cached and cached[0] == version:
+            return cached
+
+    columns = ["video_id"] + _stored_columns(with_text=False) + [f"{column}_len" for _, column in TEXT_COLUMNS]
+    conn = _get_connection()
+    # 버전과 행을 한 읽기 트랜잭션(WAL 스냅샷)에서 읽어, 다른 프로세스의 쓰기가 끼어들어도 둘이 어긋나지 않게 합니다.
+    conn.execute("BEGIN")
+    try:
+        version = get_version(bucket)
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM videos WHERE bucket = ? ORDER BY position", (bucket,)
+        ).fetchall()
+    finally:
+        conn.commit()
+    df = pd.DataFrame.from_records(rows, columns=columns).set_index("video_id")
+    df["views"] = df["views"].astype("int64")
+    df["published_at"] = pd.to_datetime(df["published_at"], errors="coerce")
+    renames = {column: label for label, column in RECORD_COLUMNS}
+    for label, column in TEXT_COLUMNS:
+        renames[f"{column}_preview"] = label
+        renames[f"{column}_len"] = f"{label} 길이"
+        df[f"{column}_len"] = df[f"{column}_len"].astype("int64")
+    df = df.rename(columns=renames)
+
+    with _frame_lock:
+        _frame_cache[bucket] = (version, df)
+    return version, df
@@ -1,19 +1,127 @@
 import os
+import re
 import json
-import time
 import subprocess
 import urllib.parse
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from functools import wraps
-import re
+import io
+import queue
+import itertools
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import googleapiclient.discovery
-from googleapiclient.http import HttpError
+from googleapiclient.http import HttpError, HttpRequest, build_http
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
+import caption_utils
+import job_utils
+import quota_utils
+import storage_utils
+
 # --- Constants ---
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+DEFAULT_MAX_WORKERS = 8
+VIDEOS_LIST_BATCH_SIZE = 50  # videos.list 요청당 최대 ID 수
+TRANSCRIPT_CACHE_NAMESPACE = 'transcripts'
+TRANSCRIPT_CACHE_TTL = 30 * 24 * 60 * 60  # 30일
+TRANSCRIPT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+CHANNEL_HANDLE_CACHE_NAMESPACE = 'channel_handles'
+CHANNEL_HANDLE_CACHE_TTL = 90 * 24 * 60 * 60  # 핸들은 거의 바뀌지 않으므로 90일
+CHANNEL_HANDLE_CACHE_MAX_ENTRIES = 10000
+CHANNEL_META_CACHE_NAMESPACE = 'channel_meta'  # snippet, contentDetails
+CHANNEL_META_CACHE_TTL = 7 * 24 * 60 * 60  # 7일
+CHANNEL_STATS_CACHE_NAMESPACE = 'channel_stats'  # 구독자 수 등 자주 바뀌는 값
+CHANNEL_STATS_CACHE_TTL = 60 * 60  # 1시간
+CHANNEL_INFO_CACHE_MAX_ENTRIES = 5000
+COMMENTS_PAGE_SIZE = 100  # commentThreads.list / comments.list 요청당 최대 결과 수
+COMMENTS_TEXT_LIMIT = 200  # 수집 레코드의 '댓글' 항목에 넣는 댓글 수 상한 (전체는 댓글 저장소에 있습니다)
+YOUTUBE_HOSTS = ('youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtube-nocookie.com')
+VIDEO_PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+NO_TRANSCRIPT_RESULTS = ("자막 없음", "자막 추출 오류")
+QUOTA_COST_LIST = 1  # list 계열 요청 1회당 할당량 단위
+
+_thread_local = threading.local()
+_api_key_lock = threading.Lock()
+_ydl_pool = queue.LifoQueue()  # 재사용할 yt_dlp.YoutubeDL 인스턴스
+_youtube_clients = {}  # API 키별로 한 번만 만든 YouTube 클라이언트
+_youtube_clients_lock = threading.Lock()
+_discovery_document = None
+
+# --- Concurrency Helpers ---
+def _thread_safe_request_builder(http, postproc, uri, *args, **kwargs):
+    """Gives every worker thread its own httplib2 connection (httplib2 is not thread-safe)
+    and records the estimated quota cost of each request against its API key."""
+    if not hasattr(_thread_local, 'http'):
+        _thread_local.http = build_http()
+
+    api_key = urllib.parse.parse_qs(urllib.parse.urlparse(uri).query).get('key', [None])[0]
+    if api_key:
+        try:
+            quota_utils.record_usage(api_key, quota_utils.estimate_cost(kwargs.get('methodId')))
+        except Exception:
+            pass # 사용량 기록 실패가 API 호출을 막지 않도록 무시합니다.
+    return HttpRequest(_thread_local.http, postproc, uri, *args, **kwargs)
+
+def _get_discovery_document():
+    """Loads the YouTube v3 discovery document once, from the copy bundled with google-api-python-client."""
+    global _discovery_document
+    if _discovery_document is None:
+        try:
+            from googleapiclient import discovery_cache
+            _discovery_document = discovery_cache.get_static_doc('youtube', 'v3')
+        except ImportError:
+            _discovery_document = None
+    return _discovery_document
+
+def build_youtube_client(api_key):
+    """Returns the YouTube client for a key, building it only once per key.
+
+    Clients are shared between worker threads (see _thread_safe_request_builder), so switching
+    keys is a dictionary lookup and no discovery request is made after the first build.
+    """
+    with _youtube_clients_lock:
+        client = _youtube_clients.get(api_key)
+        if client is None:
+            discovery_document = _get_discovery_document()
+            if discovery_document:
+                client = googleapiclient.discovery.build_from_document(
+                    discovery_document, developerKey=api_key, requestBuilder=_thread_safe_request_builder
+                )
+            else: # 번들된 문서가 없는 구버전 라이브러리
+                client = googleapiclient.discovery.build('youtube', 'v3', developerKey=api_key, requestBuilder=_thread_safe_request_builder)
+            _youtube_clients[api_key] = client
+    return client
+
+def _attach_script_run_ctx(ctx):
+    if ctx is None:
+        return
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+    add_script_run_ctx(threading.current_thread(), ctx)
+
+def run_concurrently(st, func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """Runs func(item) on a bounded thread pool and returns the results in input order."""
+    items = list(items)
+    if not items:
+        return []
+    max_workers = max(1, min(int(max_workers or 1), len(items)))
+    if max_workers == 1:
+        return [func(item) for item in items]
+
+    # 작업 스레드에서도 st.session_state / st.warning 등을 쓸 수 있도록 현재 스크립트 컨텍스트를 연결합니다.
+    ctx = None
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        pass
+
+    with ThreadPoolExecutor(max_workers=max_workers, initializer=_attach_script_run_ctx, initargs=(ctx,)) as executor:
+        return list(executor.map(func, items))
 
 # --- Session State Management ---
 def init_session_state(st):
@@ -22,6 +130,8 @@ def init_session_state(st):
         st.session_state.youtube_api_keys = []
     if 'gemini_api_key' not in st.session_state:
         st.session_state.gemini_api_key = ""
+    if 'gemini_api_keys' not in st.session_state:
+        st.session_state.gemini_api_keys = []
     if 'current_api_key_index' not in st.session_state:
         st.session_state.current_api_key_index = 0
     if 'youtube_client' not in st.session_state:
@@ -35,11 +145,20 @@ def init_session_state(st):
 
 def initialize_clients(st):
     """Initializes YouTube client and stores it in session_state."""
-    # Initialize YouTube client
-    if st.session_state.get('youtube_api_keys'):
-        current_key = st.session_state.youtube_api_keys[st.session_state.current_api_key_index]
+    # Initialize YouTube client with the key that has the most quota left
+    api_keys = st.session_state.get('youtube_api_keys')
+    if api_keys:
+        best_index = quota_utils.pick_key_index(api_keys, st.session_state.current_api_key_index)
+        if best_index is not None:
+            st.session_state.current_api_key_index = best_index
+        elif st.session_state.current_api_key_index >= len(api_keys):
+            st.session_state.current_api_key_index = 0
+        current_key = api_keys[st.session_state.current_api_key_index]
         try:
-            st.session_state.youtube_client = googleapiclient.discovery.build('youtube', 'v3', developerKey=current_key)
+            st.session_state.youtube_client = build_youtube_client(current_key)
+            # 키 전환이 즉시 이루어지도록 나머지 키의 클라이언트도 미리 만들어 둡니다.
+            for api_key in api_keys:
+                build_youtube_client(api_key)
         except Exception as e:
             st.error(f"YouTube API 클라이언트 초기화 실패: {e}")
             st.session_state.youtube_client = None
@@ -51,45 +170,71 @@ def initialize_clients(st):
     st.session_state.gspread_client = None
     st.session_state.spreadsheet = None
 
+def switch_to_api_key(st, index):
+    """Switches the YouTube client to the API key at 'index'."""
+    current_key = st.session_state.youtube_api_keys[index]
+    try:
+        st.session_state.youtube_client = build_youtube_client(current_key)
+        st.session_state.current_api_key_index = index
+        return True
+    except Exception as e:
+        st.error(f"API 클라이언트 생성 실패: {e}")
+        return False
+
 def switch_to_next_api_key(st):
-    """Switches to the next available API key."""
+    """Switches to the available API key with the most remaining quota."""
     if not st.session_state.youtube_api_keys:
         st.warning("사용 가능한 API 키가 없습니다.")
         return False
-    
-    st.session_state.current_api_key_index = (st.session_state.current_api_key_index + 1) % len(st.session_state.youtube_api_keys)
-    current_key = st.session_state.youtube_api_keys[st.session_state.current_api_key_index]
-    
-    try:
-        st.session_state.youtube_client = googleapiclient.discovery.build('youtube', 'v3', developerKey=current_key)
-        st.info(f"API 키 변경 완료. (인덱스: {st.session_state.current_api_key_index})")
+
+    best_index = quota_utils.pick_key_index(st.session_state.youtube_api_keys)
+    if best_index is None:
+        st.warning("할당량이 남은 API 키가 없습니다.")
+        return False
+    if switch_to_api_key(st, best_index):
+        st.info(f"API 키 변경 완료. (인덱스: {best_index})")
         return True
-    except Exception as e:
-        st.error(f"API 클라이언트 생성 실패: {e}")
+    return False
+
+def is_quota_error(error):
+    """True if an HttpError reports an exhausted daily quota (checked by error reason, not message text)."""
+    if not isinstance(error, HttpError):
         return False
+    try:
+        content = json.loads(error.content.decode('utf-8'))
+        reasons = {detail.get('reason') for detail in content.get('error', {}).get('errors', [])}
+    except (ValueError, AttributeError):
+        reasons = set()
+    return bool(reasons & set(quota_utils.QUOTA_ERROR_REASONS))
 
 def with_api_quota_handling(func):
-    """Decorator to handle YouTube API quota errors by switching keys."""
+    """Decorator that schedules calls on the API key with the most quota headroom.
+
+    Before each attempt the key pool is consulted (quota_utils), so a key running low is replaced
+    proactively. A key that fails with a quota error is parked until the Pacific-time reset and the
+    call is retried on the next best key.
+    """
     @wraps(func)
     def wrapper(st, *args, **kwargs):
-        max_retries = len(st.session_state.get('youtube_api_keys', []))
-        for attempt in range(max_retries):
+        api_keys = st.session_state.get('youtube_api_keys', [])
+        for attempt in range(len(api_keys)):
+            with _api_key_lock:
+                current_index = st.session_state.get('current_api_key_index', 0)
+                best_index = quota_utils.pick_key_index(api_keys, current_index)
+                if best_index is None:
+                    break
+                if best_index != current_index or not st.session_state.get('youtube_client'):
+                    if not switch_to_api_key(st, best_index):
+                        break
             try:
                 return func(st, *args, **kwargs)
-            except Exception as e:
-                error_str = str(e)
-                if "quota" in error_str.lower() or "exceeded" in error_str.lower():
-                    st.warning(f"API 할당량 초과 감지. 다음 키로 전환합니다...")
-                    if attempt < max_retries - 1:
-                        if switch_to_next_api_key(st):
-                            st.info(f"다음 API 키로 재시도 ({attempt+2}/{max_retries})")
-                            continue
-                        else:
-                            st.error("다음 API 키로 전환 실패.")
-                            break
-                raise e
-        # This part is reached if all retries fail
-        st.error("모든 API 키의 할당량을 소진했거나 오류가 발생했습니다.")
+            except HttpError as e:
+                if not is_quota_error(e):
+                    raise
+                quota_utils.park_key(api_keys[best_index])
+                st.warning(f"API 키 {best_index + 1}의 할당량이 소진되어 다음 초기화(태평양 시간 자정)까지 제외합니다.")
+        # This part is reached if all keys are exhausted
+        st.error("할당량이 남은 API 키가 없습니다. 모든 키의 할당량을 소진했습니다.")
         return None
     return wrapper
 
@@ -104,27 +249,24 @@ def get_channel_id(st, channel_link):
         return channel_link.split('/channel/')[1].split('/')[0]
     
     elif '/@' in channel_link:
-        handle_encoded = channel_link.split('/@')[1].split('?')[0]
+        handle_encoded = channel_link.split('/@')[1].split('?')[0].split('/')[0]
         handle = urllib.parse.unquote(handle_encoded)
-        
-        search_response = youtube.search().list(
-            q=handle, type='channel', part='id,snippet', maxResults=5
-        ).execute()
-        
-        items = search_response.get('items', [])
-        for item in items:
-            candidate_id = item['id'].get('channelId')
-            # The search by handle can be inaccurate, so we verify with channel details
-            channel_details_resp = youtube.channels().list(part='snippet', id=candidate_id).execute()
-            if channel_details_resp.get('items'):
-                snippet = channel_details_resp['items'][0]['snippet']
-                # Check if customUrl or title matches the handle
-                if snippet.get('customUrl', '').lower() == handle.lower() or snippet.get('title', '').lower() == handle.lower():
-                    return candidate_id
-        
-        # If no exact match is found, return the first result as a fallback
-        if items:
-            return items[0]['id'].get('channelId')
+        cache_key = handle.lower()
+        try:
+            cached = storage_utils.cache_get(CHANNEL_HANDLE_CACHE_NAMESPACE, cache_key, ttl=CHANNEL_HANDLE_CACHE_TTL)
+        except Exception:
+            cached = None
+        if cached:
+            return cached
+
+        # channels.list(forHandle)은 1단위, search.list는 100단위이므로 먼저 시도합니다.
+        channel_id = _lookup_channel_id_by_handle(youtube, handle) or _search_channel_id_by_handle(youtube, handle)
+        if channel_id:
+            try:
+                storage_utils.cache_set(CHANNEL_HANDLE_CACHE_NAMESPACE, cache_key, channel_id, max_entries=CHANNEL_HANDLE_CACHE_MAX_ENTRIES)
+            except Exception:
+                pass
+            return channel_id
         st.warning(f"핸들 '{handle}'에 해당하는 채널을 찾지 못했습니다.")
         return None
 
@@ -138,80 +280,230 @@ def get_channel_id(st, channel_link):
     st.warning(f"채널 ID를 찾을 수 없습니다: {channel_link}")
     return None
 
+def _lookup_channel_id_by_handle(youtube, handle):
+    """Resolves a handle with channels.list(forHandle=...), or returns None if it cannot."""
+    try:
+        response = youtube.channels().list(part='id', forHandle=handle).execute()
+    except TypeError:
+        return None # forHandle 파라미터가 없는 구버전 디스커버리 문서
+    items = response.get('items', [])
+    return items[0]['id'] if items else None
+
+def _search_channel_id_by_handle(youtube, handle):
+    """Fallback: searches for the handle and verifies all candidates with a single channels.list call."""
+    search_response = youtube.search().list(
+        q=handle, type='channel', part='id', maxResults=5
+    ).execute()
+    candidate_ids = [item['id'].get('channelId') for item in search_response.get('items', []) if item['id'].get('channelId')]
+    if not candidate_ids:
+        return None
+
+    # The search by handle can be inaccurate, so we verify with channel details
+    details_response = youtube.channels().list(part='snippet', id=','.join(candidate_ids)).execute()
+    snippets = {item['id']: item['snippet'] for item in details_response.get('items', [])}
+    for candidate_id in candidate_ids:
+        snippet = snippets.get(candidate_id, {})
+        # Check if customUrl or title matches the handle
+        if snippet.get('customUrl', '').lower().lstrip('@') == handle.lower() or snippet.get('title', '').lower() == handle.lower():
+            return candidate_id
+
+    # If no exact match is found, return the first result as a fallback
+    return candidate_ids[0]
+
 def get_video_id(url):
-    """Extracts video ID from a YouTube URL."""
-    if "youtube.com/watch?v=" in url:
-        return url.split("watch?v=")[1].split("&")[0]
-    elif "youtu.be/" in url:
-        return url.split("youtu.be/")[1].split("?")[0]
+    """Extracts the video ID from a YouTube video URL, or returns None for anything else (e.g. channel URLs).
+
+    Handles watch?v=, youtu.be/, shorts/, embed/, live/ and v/ links on www./m./music. hosts and
+    youtube-nocookie.com, with or without a scheme and with any extra query parameters or fragments.
+    """
+    url = (url or "").strip()
+    if not url:
+        return None
+    if '://' not in url:
+        url = f"https://{url}"
+    parsed = urllib.parse.urlsplit(url)
+    host = (parsed.hostname or "").lower()
+    if host.startswith('www.'):
+        host = host[4:]
+
+    video_id = None
+    if host == 'youtu.be':
+        video_id = parsed.path.lstrip('/').split('/')[0]
+    elif host in YOUTUBE_HOSTS:
+        path_parts = [part for part in parsed.path.split('/') if part]
+        if path_parts[:1] == ['watch']:
+            video_id = urllib.parse.parse_qs(parsed.query).get('v', [None])[0]
+        elif len(path_parts) >= 2 and path_parts[0] in VIDEO_PATH_PREFIXES:
+            video_id = path_parts[1]
+    if video_id and VIDEO_ID_RE.match(video_id):
+        return video_id
     return None
 
-def process_urls(st, urls, video_count, min_view_count, comment_count, script_numbering, comment_numbering, existing_video_ids=None):
-    """Processes a list of URLs, with numbering options."""
-    if existing_video_ids is None:
-        existing_video_ids = set()
-    else:
-        existing_video_ids = set(existing_video_ids)
+def normalize_video_url(url):
+    """Returns the canonical watch URL for any supported YouTube video URL, or None."""
+    video_id = get_video_id(url)
+    return f"https://www.youtube.com/watch?v={video_id}" if video_id else None
 
-    all_results = []
+def _apply_numbering(results, script_numbering, comment_numbering):
+    """Applies script/comment numbering in result order, independent of fetch completion order."""
     script_index = 1
     comment_index = 1
-    
+    for video_info in results:
+        if script_numbering and video_info["자막"] not in NO_TRANSCRIPT_RESULTS:
+            video_info["자막"] = f"{script_index}. {video_info['자막']}"
+            script_index += 1
+        if comment_numbering and isinstance(video_info["댓글"], list):
+            numbered_comments = [f"{comment_index}.{i+1} {comment}" for i, comment in enumerate(video_info["댓글"])]
+            video_info["댓글"] = "\n".join(numbered_comments)
+            comment_index += 1
+        elif isinstance(video_info["댓글"], list):
+            video_info["댓글"] = "\n".join(video_info["댓글"])
+    return results
+
+def _plan_video_ids(st, urls, video_count, min_view_count, existing_video_ids, metadata_by_id, scan_options, scan_reports):
+    """Resolves URLs/channels into the ordered list of video IDs to collect; channel scan reports are appended to scan_reports."""
+    video_ids = []
     for url in urls:
         video_id = get_video_id(url)
         if video_id:
             if video_id in existing_video_ids:
                 continue # 이미 수집된 개별 영상은 건너뜁니다.
-            with st.spinner(f"영상 처리 중: {url}"):
-                video_info = get_video_details(st, video_id, comment_count)
-                if video_info:
-                    # Apply numbering if requested
-                    if script_numbering and video_info["자막"] not in ["자막 없음", "자막 추출 오류"]:
-                        video_info["자막"] = f"{script_index}. {video_info['자막']}"
-                        script_index += 1
-                    if comment_numbering and isinstance(video_info["댓글"], list):
-                        numbered_comments = [f"{comment_index}.{i+1} {comment}" for i, comment in enumerate(video_info["댓글"])]
-                        video_info["댓글"] = "\n".join(numbered_comments)
-                        comment_index += 1
-                    
-                    all_results.append(video_info)
-                    existing_video_ids.add(video_id) # 중복 처리를 위해 추가
+            video_ids.append(video_id)
+            existing_video_ids.add(video_id) # 중복 처리를 위해 추가
         else: # Assume it's a channel URL or name
             with st.spinner(f"채널 처리 중: {url}"):
                 channel_id = get_channel_id(st, url)
                 if channel_id:
-                    videos = get_latest_videos(st, channel_id, video_count, min_view_count, existing_video_ids=existing_video_ids)
+                    videos = get_latest_videos(st, channel_id, video_count, min_view_count, existing_video_ids=existing_video_ids, scan_reports=scan_reports, **scan_options) or []
                     for video in videos:
-                        with st.spinner(f"영상 '{video['title']}' 처리 중..."):
-                             video_info = get_video_details(st, video['videoId'], comment_count)
-                             if video_info:
-                                # Apply numbering if requested
-                                if script_numbering and video_info["자막"] not in ["자막 없음", "자막 추출 오류"]:
-                                    video_info["자막"] = f"{script_index}. {video_info['자막']}"
-                                    script_index += 1
-                                if comment_numbering and isinstance(video_info["댓글"], list):
-                                    numbered_comments = [f"{comment_index}.{i+1} {comment}" for i, comment in enumerate(video_info["댓글"])]
-                                    video_info["댓글"] = "\n".join(numbered_comments)
-                                    comment_index += 1
-
-                                all_results.append(video_info)
-                                existing_video_ids.add(video['videoId']) # 중복 처리를 위해 추가
-    return all_results
-
-def get_video_details(st, video_id, comment_count):
-    """Fetches all details for a single video."""
+                        if video['videoId'] not in existing_video_ids:
+                            video_ids.append(video['videoId'])
+                            existing_video_ids.add(video['videoId']) # 중복 처리를 위해 추가
+                            if video.get('metadata'):
+                                metadata_by_id[video['videoId']] = video['metadata']
+    return video_ids
+
+def process_urls(st, urls, video_count, min_view_count, comment_count, script_numbering, comment_numbering, existing_video_ids=None, max_workers=DEFAULT_MAX_WORKERS, job_id=None, scan_options=None, include_replies=False):
+    """Processes a list of URLs, with numbering options.
+
+    Video details (metadata, transcript, comments) are fetched on a bounded thread pool;
+    results keep the input order so numbering stays stable.
+    'scan_options' (max_pages, published_after, max_age_days) bounds the channel scans in get_latest_videos.
+    With a job_id (see job_utils), the video plan, the channel scan reports and every finished video
+    are checkpointed, and calling again with the same job_id only fetches the videos that are still missing.
+    """
+    if existing_video_ids is None:
+        existing_video_ids = set()
+    else:
+        existing_video_ids = set(existing_video_ids)
+
+    # 1. 입력 순서대로 수집할 영상 ID 목록을 확정합니다. (이어서 수집하는 경우 저장된 목록 사용)
+    metadata_by_id = {}
+    job = job_utils.get_job(job_id) if job_id else None
+    if job and job.get('plan') is not None:
+        video_ids = [video_id for video_id in job['plan'] if video_id not in existing_video_ids]
+    else:
+        scan_reports = []
+        video_ids = _plan_video_ids(st, urls, video_count, min_view_count, existing_video_ids, metadata_by_id, scan_options or {}, scan_reports)
+        if job_id:
+            job_utils.save_job_plan(job_id, video_ids)
+            job_utils.save_job_scan_reports(job_id, scan_reports)
+
+    completed = job_utils.load_job_items(job_id) if job_id else {}
+    pending_ids = [video_id for video_id in video_ids if video_id not in completed]
+
+    # 2. 채널 목록에서 이미 받은 메타데이터는 재사용하고, 나머지만 50개 단위로 일괄 조회합니다.
+    missing_ids = [video_id for video_id in pending_ids if video_id not in metadata_by_id]
+    if missing_ids:
+        with st.spinner(f"영상 정보 {len(missing_ids)}개 일괄 조회 중..."):
+            fetched = get_videos_metadata(st, missing_ids)
+        if fetched is not None:
+            metadata_by_id.update(fetched)
+            for video_id in missing_ids:
+                if video_id not in fetched:
+                    st.warning(f"영상 정보를 가져올 수 없습니다: {video_id}")
+            pending_ids = [video_id for video_id in pending_ids if video_id in metadata_by_id]
+
+    # 3. 영상별 자막/댓글을 병렬로 수집하고, 끝난 영상은 바로 체크포인트에 저장합니다.
+    def fetch(video_id):
+        video_info = get_video_details(st, video_id, comment_count, join_comments=False, metadata=metadata_by_id.get(video_id), include_replies=include_replies)
+        if video_info and job_id:
+            job_utils.save_job_item(job_id, video_id, video_info)
+        return video_info
+
+    if completed:
+        st.info(f"이전 작업에서 수집된 영상 {len(completed)}개를 재사용합니다.")
+    with st.spinner(f"영상 {len(pending_ids)}개 처리 중... (동시 작업 {max_workers}개)"):
+        details = run_concurrently(st, fetch, pending_ids, max_workers)
+
+    fetched_by_id = dict(zip(pending_ids, details))
+    all_results = [completed.get(video_id) or fetched_by_id.get(video_id) for video_id in video_ids]
+    all_results = [video_info for video_info in all_results if video_info]
+    return _apply_numbering(all_results, script_numbering, comment_numbering)
+
+def collect_channel_scripts(st, channel_url, video_count):
+    """Collects transcripts of a channel's latest videos for channel analysis.
+
+    Returns (channel title, scripts text); the title is None if the channel could not be resolved.
+    """
+    channel_id = get_channel_id(st, channel_url)
+    if not channel_id:
+        return None, ""
+
+    channel_info = get_channel_info(st, channel_id, include_statistics=False) or {}
+    display_name = channel_info.get('snippet', {}).get('title', channel_url)
+    videos = get_latest_videos(st, channel_id, video_count, 0) or []
+
+    # 채널 분석에는 자막만 필요하므로 댓글 없이 자막만 병렬로 가져옵니다.
+    transcripts = run_concurrently(st, lambda video: get_video_transcript(st, video['videoId']), videos)
+    all_scripts_text = "".join(
+        f"제목: {video['title']}\n대본: {transcript}\n\n"
+        for video, transcript in zip(videos, transcripts)
+        if transcript not in NO_TRANSCRIPT_RESULTS
+    )
+    return display_name, all_scripts_text
+
+@with_api_quota_handling
+def get_videos_metadata(st, video_ids):
+    """Fetches snippet/statistics for many videos, 50 IDs per videos.list call.
+
+    Returns a dict mapping video ID to the API item; unavailable videos are omitted.
+    """
     youtube = st.session_state.youtube_client
-    try:
+    metadata = {}
+    unique_ids = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+    for start in range(0, len(unique_ids), VIDEOS_LIST_BATCH_SIZE):
+        batch = unique_ids[start:start + VIDEOS_LIST_BATCH_SIZE]
         video_response = youtube.videos().list(
-            id=video_id,
+            id=','.join(batch),
             part='snippet,statistics'
         ).execute()
-        
-        if not video_response.get('items'):
-            st.warning(f"영상 정보를 가져올 수 없습니다: {video_id}")
-            return None
-            
-        item = video_response['items'][0]
+        for item in video_response.get('items', []):
+            metadata[item['id']] = item
+    return metadata
+
+def get_video_details(st, video_id, comment_count, join_comments=True, metadata=None, include_replies=False):
+    """Fetches all details for a single video.
+
+    'metadata' is an already fetched videos.list item (snippet, statistics); when given,
+    no extra videos.list call is made.
+    """
+    youtube = st.session_state.youtube_client
+    try:
+        if metadata:
+            item = metadata
+        else:
+            video_response = youtube.videos().list(
+                id=video_id,
+                part='snippet,statistics'
+            ).execute()
+
+            if not video_response.get('items'):
+                st.warning(f"영상 정보를 가져올 수 없습니다: {video_id}")
+                return None
+
+            item = video_response['items'][0]
+
         title = item['snippet'].get('title', 'N/A')
         channel_title = item['snippet'].get('channelTitle', 'N/A')
         published_at = item['snippet'].get('publishedAt', '')
@@ -222,7 +514,10 @@ def get_video_details(st, video_id, comment_count):
             published_at = dt.strftime("%Y-%m-%d %H:%M:%S")
 
         transcript = get_video_transcript(st, video_id)
-        comments = get_top_comments(st, video_id, comment_count)
+        comments = get_top_comments(st, video_id, comment_count, include_replies)
+        if not isinstance(comments, str):
+            # 레코드와 프롬프트에는 앞부분만 넣고, 전체 댓글은 storage_utils.iter_comments로 읽습니다.
+            comments = comment_lines(comments)
         description = item['snippet'].get('description', '설명 없음')
         
         return {
@@ -232,39 +527,73 @@ def get_video_details(st, video_id, comment_count):
             "조회수": int(view_count),
             "게시일": published_at,
             "자막": transcript,
-            "댓글": "\n".join(comments) if isinstance(comments, list) else comments,
+            "댓글": "\n".join(comments) if join_comments and isinstance(comments, list) else comments,
             "설명": description
         }
     except Exception as e:
         st.error(f"영상({video_id}) 처리 중 오류: {e}")
         return None
 
+def _parse_published_after(published_after, max_age_days):
+    """Combines an explicit cutoff (datetime or ISO string) and a max age into one UTC cutoff, or None."""
+    cutoffs = []
+    if published_after:
+        if isinstance(published_after, str):
+            published_after = datetime.fromisoformat(published_after.replace("Z", "+00:00"))
+        if published_after.tzinfo is None:
+            published_after = published_after.replace(tzinfo=timezone.utc)
+        cutoffs.append(published_after)
+    if max_age_days:
+        cutoffs.append(datetime.now(timezone.utc) - timedelta(days=max_age_days))
+    return max(cutoffs) if cutoffs else None
+
 @with_api_quota_handling
-def get_latest_videos(st, channel_id, max_results, min_view_count, existing_video_ids=None):
+def get_latest_videos(st, channel_id, max_results, min_view_count, existing_video_ids=None, max_pages=None, published_after=None, max_age_days=None, scan_reports=None):
+    """Scans a channel's uploads (newest first) for videos with at least min_view_count views.
+
+    The scan stops early after max_pages playlist pages or once uploads are older than the
+    published_after / max_age_days cutoff. A per-channel report (channel ID, pages scanned, estimated
+    quota units, stop reason) is appended to the 'scan_reports' list when one is given.
+    """
     if existing_video_ids is None:
         existing_video_ids = set()
     else:
         existing_video_ids = set(existing_video_ids)
 
     youtube = st.session_state.youtube_client
+    cutoff = _parse_published_after(published_after, max_age_days)
+    report = {"channel_id": channel_id, "pages_scanned": 0, "videos_checked": 0, "quota_units": 0, "found": 0, "stop_reason": ""}
+    if scan_reports is not None:
+        scan_reports.append(report)
 
     # 1. 채널 정보에서 업로드 플레이리스트 ID 가져오기
     try:
-        channel_info = get_channel_info(st, channel_id)
+        channel_info = get_cached_channel_info(channel_id, include_statistics=False)
+        if channel_info is None:
+            channel_info = get_channel_info(st, channel_id, include_statistics=False) or {}
+            report["quota_units"] += QUOTA_COST_LIST
+        report["channel_title"] = channel_info.get('snippet', {}).get('title', channel_id)
         uploads_playlist_id = channel_info.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
         if not uploads_playlist_id:
             st.error(f"채널의 업로드 목록을 찾을 수 없습니다: {channel_id}")
+            report["stop_reason"] = "업로드 목록 없음"
             return []
     except Exception as e:
         st.error(f"채널 정보를 가져오는 중 오류 발생: {e}")
+        report["stop_reason"] = "오류"
         return []
 
     # 2. 플레이리스트를 페이지네이션하며 새로운 영상 찾기
     new_videos = []
     next_page_token = None
     
-    # 충분한 새 영상을 찾거나 플레이리스트 끝에 도달할 때까지 반복
+    # 충분한 새 영상을 찾거나, 스캔 한도/기준일에 도달하거나, 플레이리스트 끝에 도달할 때까지 반복
     while len(new_videos) < max_results:
+        if max_pages and report["pages_scanned"] >= max_pages:
+            report["stop_reason"] = "최대 페이지 도달"
+            st.warning(f"'{report['channel_title']}' 채널: 최대 {max_pages}페이지를 스캔했지만 조건에 맞는 영상이 {len(new_videos)}개뿐입니다.")
+            break
+
         try:
             playlist_request = youtube.playlistItems().list(
                 part="snippet",
@@ -273,14 +602,30 @@ def get_latest_videos(st, channel_id, max_results, min_view_count, existing_vide
                 pageToken=next_page_token
             )
             playlist_response = playlist_request.execute()
+            report["pages_scanned"] += 1
+            report["quota_units"] += QUOTA_COST_LIST
         except Exception as e:
             st.error(f"플레이리스트 항목을 가져오는 중 오류 발생: {e}")
+            report["stop_reason"] = "오류"
             break
 
         playlist_items = playlist_response.get("items", [])
         if not playlist_items:
+            report["stop_reason"] = "업로드 목록 끝"
             break  # 플레이리스트에 더 이상 영상이 없음
 
+        # 기준일 이전에 올라온 영상은 제외 (업로드 목록은 최신순이므로 이후 페이지도 볼 필요가 없음)
+        reached_cutoff = False
+        if cutoff:
+            recent_items = []
+            for item in playlist_items:
+                item_published_at = item.get("snippet", {}).get("publishedAt")
+                if item_published_at and datetime.fromisoformat(item_published_at.replace("Z", "+00:00")) < cutoff:
+                    reached_cutoff = True
+                    continue
+                recent_items.append(item)
+            playlist_items = recent_items
+
         # 현재 페이지의 영상 ID 목록 추출
         video_ids_on_page = [
             item.get("snippet", {}).get("resourceId", {}).get("videoId")
@@ -298,6 +643,8 @@ def get_latest_videos(st, channel_id, max_results, min_view_count, existing_vide
                     id=','.join(ids_to_check),
                     part='statistics,snippet'
                 ).execute()
+                report["quota_units"] += QUOTA_COST_LIST
+                report["videos_checked"] += len(ids_to_check)
                 video_items = video_response.get('items', [])
             except Exception as e:
                 st.warning(f"영상 통계 정보를 가져오는 중 오류 발생: {e}")
@@ -309,99 +656,308 @@ def get_latest_videos(st, channel_id, max_results, min_view_count, existing_vide
                     new_videos.append({
                         'videoId': item.get('id'),
                         'title': item.get('snippet', {}).get('title', 'No Title'),
-                        'viewCount': view_count
+                        'viewCount': view_count,
+                        'metadata': item
                     })
                     if len(new_videos) >= max_results:
                         break  # 요청한 개수를 채웠으면 중단
 
         if len(new_videos) >= max_results:
+            report["stop_reason"] = "목표 개수 달성"
+            break
+        if reached_cutoff:
+            report["stop_reason"] = "기준일 이전 영상 도달"
             break
 
         # 4. 다음 페이지 토큰 확인
         next_page_token = playlist_response.get("nextPageToken")
         if not next_page_token:
+            report["stop_reason"] = "업로드 목록 끝"
             break  # 플레이리스트의 끝
 
+    report["found"] = min(len(new_videos), max_results)
     return new_videos[:max_results]
 
 @with_api_quota_handling
-def get_top_comments(st, video_id, max_results):
+def _fetch_comment_threads_page(st, video_id, page_size, page_token, include_replies, order):
     youtube = st.session_state.youtube_client
+    return youtube.commentThreads().list(
+        part="snippet,replies" if include_replies else "snippet",
+        videoId=video_id,
+        order=order,
+        textFormat="plainText",
+        maxResults=page_size,
+        pageToken=page_token
+    ).execute()
+
+@with_api_quota_handling
+def _fetch_comment_replies_page(st, parent_id, page_token):
+    youtube = st.session_state.youtube_client
+    return youtube.comments().list(
+        part="snippet",
+        parentId=parent_id,
+        textFormat="plainText",
+        maxResults=COMMENTS_PAGE_SIZE,
+        pageToken=page_token
+    ).execute()
+
+def _comment_from_resource(resource, parent_id=None):
+    snippet = resource["snippet"]
+    return {
+        "comment_id": resource["id"],
+        "parent_id": parent_id,
+        "author": snippet.get("authorDisplayName"),
+        "text": snippet.get("textDisplay", ""),
+        "like_count": snippet.get("likeCount", 0),
+        "published_at": snippet.get("publishedAt"),
+    }
+
+def iter_comments(st, video_id, max_results, include_replies=False, order="relevance"):
+    """
+    Yields up to 'max_results' comments (top-level comments and, optionally, their replies) as dicts,
+    following commentThreads pages. Replies come inline with the thread (up to 5); only threads with
+    more replies than that are paged through comments.list(parentId=...).
+    """
+    yielded = 0
+    page_token = None
+    while yielded < max_results:
+        response = _fetch_comment_threads_page(
+            st, video_id, min(COMMENTS_PAGE_SIZE, max_results - yielded), page_token, include_replies, order
+        )
+        if response is None: # 모든 키의 할당량 소진
+            return
+
+        for thread in response.get("items", []):
+            top_level = thread["snippet"]["topLevelComment"]
+            yield _comment_from_resource(top_level)
+            yielded += 1
+            if yielded >= max_results:
+                return
+            if not include_replies or not thread["snippet"].get("totalReplyCount"):
+                continue
+
+            inline_replies = thread.get("replies", {}).get("comments", [])
+            if len(inline_replies) >= thread["snippet"]["totalReplyCount"]:
+                replies = inline_replies
+            else:
+                replies = _iter_all_replies(st, top_level["id"])
+            for reply in replies:
+                yield _comment_from_resource(reply, parent_id=top_level["id"])
+                yielded += 1
+                if yielded >= max_results:
+                    return
+
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return
+
+def _iter_all_replies(st, parent_id):
+    page_token = None
+    while True:
+        response = _fetch_comment_replies_page(st, parent_id, page_token)
+        if response is None:
+            return
+        yield from response.get("items", [])
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return
+
+def get_top_comments(st, video_id, max_results, include_replies=False):
+    """
+    Collects comments page by page, writing each page to the local comment store as it arrives.
+    Nothing is accumulated in memory: returns a lazy iterator over the stored comment dicts in
+    collection order (storage_utils.iter_comments), or '댓글 없음' / '댓글 가져오기 실패'.
+    When the store already holds at least max_results comments for the video (e.g. from a large
+    collection), they are read from there instead, so a smaller fetch never replaces a larger set.
+    """
+    if storage_utils.count_comments(video_id, include_replies) >= max_results:
+        return storage_utils.iter_comments(video_id, include_replies=include_replies, limit=max_results)
+
+    batch = []
+    first_batch = True
+    collected = 0
     try:
-        comment_response = youtube.commentThreads().list(
-            part="snippet",
-            videoId=video_id,
-            order="relevance",
-            textFormat="plainText",
-            maxResults=max_results
-        ).execute()
-        
-        comments = [item["snippet"]["topLevelComment"]["snippet"]["textDisplay"] for item in comment_response.get("items", [])]
-        return comments if comments else "댓글 없음"
+        for comment in iter_comments(st, video_id, max_results, include_replies):
+            batch.append(comment)
+            collected += 1
+            if len(batch) >= COMMENTS_PAGE_SIZE:
+                storage_utils.save_comments(video_id, batch, replace=first_batch)
+                batch = []
+                first_batch = False
+        if batch or first_batch:
+            storage_utils.save_comments(video_id, batch, replace=first_batch)
     except Exception as e:
         st.warning(f"댓글을 가져오는 중 오류 발생: {e}")
         return "댓글 가져오기 실패"
+    if not collected:
+        return "댓글 없음"
+    return storage_utils.iter_comments(video_id)
+
+def comment_lines(comments, limit=COMMENTS_TEXT_LIMIT):
+    """Formats at most 'limit' comment dicts as text lines, replies prefixed with '↳ '."""
+    return [
+        f"↳ {comment['text']}" if comment["parent_id"] else comment["text"]
+        for comment in itertools.islice(comments, limit)
+    ]
 
 def get_video_transcript(st, video_id, lang='ko'):
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
-    temp_filename_base = f"temp_sub_{video_id}_{int(time.time())}"
-    output_template = f"{temp_filename_base}.%(ext)s"
-    subtitle_path = ""
+    """Returns the cleaned transcript, served from the on-disk cache when available."""
+    cache_key = f"{video_id}:{lang}"
+    try:
+        cached = storage_utils.cache_get(TRANSCRIPT_CACHE_NAMESPACE, cache_key, ttl=TRANSCRIPT_CACHE_TTL)
+    except Exception:
+        cached = None # 캐시 장애가 수집을 막지 않도록 무시합니다.
+    if cached is not None:
+        return cached
+
+    transcript = _extract_video_transcript(st, video_id, lang)
+    # '자막 없음'은 나중에 자동 자막이 생길 수 있으므로 캐시하지 않습니다.
+    if transcript not in NO_TRANSCRIPT_RESULTS:
+        try:
+            storage_utils.cache_set(TRANSCRIPT_CACHE_NAMESPACE, cache_key, transcript, max_bytes=TRANSCRIPT_CACHE_MAX_BYTES)
+        except Exception:
+            pass
+    return transcript
 
+def _extract_video_transcript(st, video_id, lang):
+    """Downloads subtitles in-process with yt-dlp, falling back to the yt-dlp CLI."""
+    try:
+        transcript = _download_subtitle_in_process(video_id, lang)
+    except Exception:
+        try:
+            transcript = _download_subtitle_subprocess(video_id, lang)
+        except Exception as e:
+            st.error(f"yt-dlp 실행 중 오류: {e}")
+            return "자막 추출 오류"
+
+    return transcript or "자막 없음"
+
+def _acquire_youtube_dl():
+    """Takes an idle long-lived YoutubeDL instance from the pool (instances are not shared between threads)."""
+    try:
+        return _ydl_pool.get_nowait()
+    except queue.Empty:
+        import yt_dlp
+        return yt_dlp.YoutubeDL({
+            'skip_download': True,
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+        })
+
+def _download_subtitle_in_process(video_id, lang):
+    """Returns the cleaned transcript (manual subtitles first, then auto captions), or '' if none exist."""
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    ydl = _acquire_youtube_dl()
     try:
+        info = ydl.extract_info(video_url, download=False)
+        for tracks, rolling in ((info.get('subtitles') or {}, False), (info.get('automatic_captions') or {}, True)):
+            formats = tracks.get(lang) or []
+            vtt_format = next((fmt for fmt in formats if fmt.get('ext') == 'vtt' and fmt.get('url')), None)
+            if vtt_format:
+                with ydl.urlopen(vtt_format['url']) as response:
+                    # 응답을 한 줄씩 읽으며 바로 정리합니다.
+                    return caption_utils.clean_vtt(io.TextIOWrapper(response, encoding='utf-8'), rolling=rolling)
+        return ""
+    finally:
+        _ydl_pool.put(ydl)
+
+def _download_subtitle_subprocess(video_id, lang):
+    """Fallback: runs the yt-dlp CLI into a private temp directory and returns the cleaned transcript."""
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    with tempfile.TemporaryDirectory(prefix="ytb_any_sub_") as temp_dir:
+        temp_filename_base = os.path.join(temp_dir, f"temp_sub_{video_id}")
+        output_template = f"{temp_filename_base}.%(ext)s"
         command = ['yt-dlp', '--skip-download', '--write-sub', '--write-auto-sub', '--sub-format', 'vtt', '--sub-lang', lang, '-o', output_template, video_url]
-        
+
         startupinfo = None
         if os.name == 'nt':
             startupinfo = subprocess.STARTUPINFO()
             startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-        result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', startupinfo=startupinfo)
+        subprocess.run(command, capture_output=True, text=True, encoding='utf-8', startupinfo=startupinfo)
 
         subtitle_path = f"{temp_filename_base}.{lang}.vtt"
         if not os.path.exists(subtitle_path):
-             subtitle_path_alt = f"{temp_filename_base}.vtt"
-             if os.path.exists(subtitle_path_alt):
-                 subtitle_path = subtitle_path_alt
-             else:
-                return "자막 없음"
+            subtitle_path = f"{temp_filename_base}.vtt"
+            if not os.path.exists(subtitle_path):
+                return ""
 
         with open(subtitle_path, 'r', encoding='utf-8') as f:
-            vtt_content = f.read()
+            return caption_utils.clean_vtt(f)
 
-        lines = vtt_content.splitlines()
-        transcript_lines = [re.sub(r'<[^>]+>', '', line).strip() for line in lines if '-->' not in line and line.strip() and not line.strip().isdigit() and not line.upper().startswith(('WEBVTT', 'KIND:', 'LANGUAGE:'))]
-        
-        unique_lines = []
-        for line in transcript_lines:
-            if not unique_lines or unique_lines[-1] != line:
-                unique_lines.append(line)
-
-        return "\n".join(unique_lines) if unique_lines else "자막 없음"
+def get_cached_channel_info(channel_id, include_statistics=True):
+    """Returns the cached channels resource, or None if a requested part is missing or stale."""
+    try:
+        channel_info = storage_utils.cache_get(CHANNEL_META_CACHE_NAMESPACE, channel_id, ttl=CHANNEL_META_CACHE_TTL)
+        if channel_info is None:
+            return None
+        if include_statistics:
+            statistics = storage_utils.cache_get(CHANNEL_STATS_CACHE_NAMESPACE, channel_id, ttl=CHANNEL_STATS_CACHE_TTL)
+            if statistics is None:
+                return None
+            channel_info["statistics"] = statistics
+    except Exception:
+        return None
+    return channel_info
 
-    except Exception as e:
-        st.error(f"yt-dlp 실행 중 오류: {e}")
-        return "자막 추출 오류"
-    finally:
-        if subtitle_path and os.path.exists(subtitle_path):
-            os.remove(subtitle_path)
+def _cache_channel_info(channel_info):
+    channel_id = channel_info.get("id")
+    if not channel_id:
+        return
+    try:
+        if "snippet" in channel_info:
+            meta = {key: value for key, value in channel_info.items() if key != "statistics"}
+            storage_utils.cache_set(CHANNEL_META_CACHE_NAMESPACE, channel_id, meta, max_entries=CHANNEL_INFO_CACHE_MAX_ENTRIES)
+        if "statistics" in channel_info:
+            storage_utils.cache_set(CHANNEL_STATS_CACHE_NAMESPACE, channel_id, channel_info["statistics"], max_entries=CHANNEL_INFO_CACHE_MAX_ENTRIES)
+    except Exception:
+        pass
+
+def invalidate_channel_info(channel_id):
+    """Drops the cached metadata and statistics so the next get_channel_info call refetches them."""
+    storage_utils.cache_delete(CHANNEL_META_CACHE_NAMESPACE, channel_id)
+    storage_utils.cache_delete(CHANNEL_STATS_CACHE_NAMESPACE, channel_id)
 
 @with_api_quota_handling
-def get_channel_info(st, channel_id):
+def get_channel_info(st, channel_id, include_statistics=True):
+    """
+    Returns the channels resource, served from the shared cache when fresh.
+    snippet/contentDetails are kept for CHANNEL_META_CACHE_TTL, statistics only for CHANNEL_STATS_CACHE_TTL;
+    callers that only need the uploads playlist pass include_statistics=False.
+    """
+    cached = get_cached_channel_info(channel_id, include_statistics)
+    if cached is not None:
+        return cached
+
     youtube = st.session_state.youtube_client
     request = youtube.channels().list(
         part="snippet,contentDetails,statistics",
         id=channel_id
     )
     response = request.execute()
-    return response.get("items", [{}])[0]
+    channel_info = response.get("items", [{}])[0]
+    _cache_channel_info(channel_info)
+    return channel_info
+
+def _playlist_item_video_id(item):
+    return item.get("snippet", {}).get("resourceId", {}).get("videoId")
 
 @with_api_quota_handling
-def get_uploaded_videos_playlist(st, uploads_playlist_id):
+def sync_uploaded_videos(st, uploads_playlist_id, full_refresh=False):
+    """Returns all uploads of a playlist from the local index, fetching only pages newer than the last sync.
+
+    Uploads playlists list the newest videos first, so paging stops at the first already indexed video.
+    The first sync (or full_refresh) pages through the whole playlist.
+    """
+    synced = storage_utils.get_playlist_synced_at(uploads_playlist_id) is not None
+    known_ids = storage_utils.load_playlist_video_ids(uploads_playlist_id) if synced and not full_refresh else set()
+
     youtube = st.session_state.youtube_client
-    videos = []
+    new_items = []
     next_page_token = None
-    while True:
+    reached_known = False
+    while not reached_known:
         request = youtube.playlistItems().list(
             part="snippet",
             playlistId=uploads_playlist_id,
@@ -409,16 +965,24 @@ def get_uploaded_videos_playlist(st, uploads_playlist_id):
             pageToken=next_page_token
         )
         response = request.execute()
-        videos.extend(response.get("items", []))
+        for item in response.get("items", []):
+            video_id = _playlist_item_video_id(item)
+            if not video_id:
+                continue
+            if video_id in known_ids:
+                reached_known = True
+                break
+            new_items.append(item)
         next_page_token = response.get("nextPageToken")
         if not next_page_token:
             break
-    return videos
+
+    storage_utils.save_playlist_items(uploads_playlist_id, new_items, replace=full_refresh or not synced)
+    return storage_utils.load_playlist_items(uploads_playlist_id)
 
 def analyze_upload_patterns(videos):
     """Analyzes upload time patterns using pandas."""
     import pandas as pd
-    from datetime import timedelta, timezone
 
     if not videos:
         return {}